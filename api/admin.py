@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from db.connection import DBConnection
 from sql.combinedQueries import Queries
@@ -6,12 +6,23 @@ from utils.jwt_handler import get_current_user
 from utils.hashing import hash_password
 from typing import List, Optional
 from datetime import datetime
+from sql.queries.kalamQueries import SUBMISSION_STATUSES, ADMIN_KALAM_SORTS
+from sql.queries.notificationQueries import ALL_GUEST_POSTS_QUERY
+from utils.exports import export_options, stream_export
 
 router = APIRouter(
     prefix="/admin",
     tags=["Admin"]
 )
 
+USERS_BY_ROLE_QUERY = """
+SELECT id, email, name, role, country, city
+FROM users
+WHERE role = %s
+ORDER BY id
+"""
+PARTNERSHIPS_QUERY = "SELECT * FROM partnership_proposals ORDER BY created_at DESC"
+
 # Pydantic model for creating a special recognition
 class SpecialRecognitionCreate(BaseModel):
     title: str
@@ -19,13 +30,34 @@ class SpecialRecognitionCreate(BaseModel):
     description: str | None = None
     achievement: str | None = None
 
-class KalamResponse(BaseModel):
+class AdminKalamSummary(BaseModel):
+    id: int
     title: str
     language: str | None
     theme: str | None
     sufi_influence: str | None
     musical_preference: str | None
-    id : int
+    writer_id: int | None
+    writer_name: str | None
+    vocalist_id: int | None
+    vocalist_name: str | None
+    created_at: datetime | None
+    updated_at: datetime | None
+    submission_id: int | None
+    status: str | None
+    user_approval_status: str | None
+    vocalist_approval_status: str | None
+    duplicate_of: int | None
+
+class KalamBrowseCursor(BaseModel):
+    after_value: str
+    after_id: int
+
+class KalamBrowsePage(BaseModel):
+    kalams: List[AdminKalamSummary]
+    total: int
+    total_is_estimate: bool
+    next_cursor: Optional[KalamBrowseCursor] = None
 
 class KalamByUserResponse(BaseModel):
     title: str
@@ -200,8 +232,53 @@ def get_all_subadmins(
 
 
 
-@router.get("/kalams")
+def kalam_filters(
+    status: Optional[str] = None,
+    language: Optional[str] = None,
+    theme: Optional[str] = None,
+    writer_id: Optional[int] = None,
+    vocalist_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "newest",
+) -> dict:
+    if status is not None and status not in SUBMISSION_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    if sort not in ADMIN_KALAM_SORTS:
+        raise HTTPException(status_code=400, detail=f"Sort must be one of: {', '.join(ADMIN_KALAM_SORTS)}")
+    return {
+        "status": status,
+        "language": language,
+        "theme": theme,
+        "writer_id": writer_id,
+        "vocalist_id": vocalist_id,
+        "created_from": created_from,
+        "created_to": created_to,
+        "sort": sort,
+    }
+
+def kalam_browse_filters(
+    filters: dict = Depends(kalam_filters),
+    after_value: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+) -> dict:
+    # The cursor value is the last row's sort column; dates travel as ISO strings
+    if after_value is not None and filters["sort"] != "title":
+        try:
+            after_value = datetime.fromisoformat(after_value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid after_value")
+    return {
+        **filters,
+        "after_value": after_value,
+        "after_id": after_id,
+        "limit": limit,
+    }
+
+@router.get("/kalams", response_model=KalamBrowsePage)
 def get_all_kalams(
+    filters: dict = Depends(kalam_browse_filters),
     current_user_id: int = Depends(get_current_user)
 ):
     conn = DBConnection.get_connection()
@@ -211,25 +288,70 @@ def get_all_kalams(
     if not current_user or current_user["role"] not in ("admin", "sub-admin"):
         raise HTTPException(status_code=403, detail="Only admin can view kalams")
 
-    query = """
-    SELECT title, language, theme, sufi_influence, musical_preference,id
-    FROM kalams
-    """
-    with conn.cursor() as cur:
-        cur.execute(query)
-        kalams = cur.fetchall()
-    
+    page = db.browse_kalams(**filters)
+    kalams = page["kalams"]
+    next_cursor = None
+    if len(kalams) == filters["limit"]:
+        last = kalams[-1]
+        value = last["sort_value"]
+        next_cursor = KalamBrowseCursor(
+            after_value=value.isoformat() if isinstance(value, datetime) else value,
+            after_id=last["id"]
+        )
+
+    return KalamBrowsePage(
+        kalams=[AdminKalamSummary(**kalam) for kalam in kalams],
+        total=page["total"],
+        total_is_estimate=page["total_is_estimate"],
+        next_cursor=next_cursor
+    )
+
+@router.get("/kalams/export")
+def export_kalams(
+    filters: dict = Depends(kalam_filters),
+    export: dict = Depends(export_options),
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] not in ("admin", "sub-admin"):
+        raise HTTPException(status_code=403, detail="Only admin can export kalams")
+
+    query, values = db.kalam_export_query(**filters)
+    return stream_export(query, values, export["format"], "kalams", export["itersize"])
+
+@router.post("/kalams/search-keys/sync")
+def sync_kalam_search_keys(
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can rebuild search keys")
+
+    updated = db.sync_kalam_search_keys()
+    return {"message": "Search keys rebuilt", "kalams": updated}
+
+@router.post("/kalams/near-duplicates/scan")
+def scan_near_duplicate_kalams(
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can scan for duplicate kalams")
+
+    result = db.scan_near_duplicates()
     return {
-        "kalams": [
-            KalamResponse(
-                title=kalam[0],
-                language=kalam[1],
-                theme=kalam[2],
-                sufi_influence=kalam[3],
-                musical_preference=kalam[4],
-                id=kalam[5]
-            ).dict() for kalam in kalams
-        ]
+        "message": "Near-duplicate scan complete",
+        "kalams": result["signed"],
+        "flagged": result["flagged"],
     }
 
 @router.get("/kalams/writer/{user_id}")
@@ -270,6 +392,20 @@ def get_kalams_by_writer(
         ]
     }
 
+@router.get("/vocalists/export")
+def export_vocalists(
+    export: dict = Depends(export_options),
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] not in ("admin", "sub-admin"):
+        raise HTTPException(status_code=403, detail="Only admin can export vocalists")
+
+    return stream_export(USERS_BY_ROLE_QUERY, ("vocalist",), export["format"], "vocalists", export["itersize"])
+
 @router.get("/vocalists")
 def get_all_vocalists(
     current_user_id: int = Depends(get_current_user)
@@ -281,13 +417,8 @@ def get_all_vocalists(
     if not current_user or current_user["role"] not in ("admin", "sub-admin"):
         raise HTTPException(status_code=403, detail="Only admin can view vocalists")
 
-    query = """
-    SELECT id, email, name, role, country, city
-    FROM users
-    WHERE role = 'vocalist'
-    """
     with conn.cursor() as cur:
-        cur.execute(query)
+        cur.execute(USERS_BY_ROLE_QUERY, ("vocalist",))
         users = cur.fetchall()
     
     return {
@@ -303,6 +434,20 @@ def get_all_vocalists(
         ]
     }
 
+@router.get("/writers/export")
+def export_writers(
+    export: dict = Depends(export_options),
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] not in ("admin", "sub-admin"):
+        raise HTTPException(status_code=403, detail="Only admin can export writers")
+
+    return stream_export(USERS_BY_ROLE_QUERY, ("writer",), export["format"], "writers", export["itersize"])
+
 @router.get("/writers")
 def get_all_writers(
     current_user_id: int = Depends(get_current_user)
@@ -314,13 +459,8 @@ def get_all_writers(
     if not current_user or current_user["role"] not in ("admin", "sub-admin"):
         raise HTTPException(status_code=403, detail="Only admin can view writers")
 
-    query = """
-    SELECT id, email, name, role, country, city
-    FROM users
-    WHERE role = 'writer'
-    """
     with conn.cursor() as cur:
-        cur.execute(query)
+        cur.execute(USERS_BY_ROLE_QUERY, ("writer",))
         users = cur.fetchall()
     
     return {
@@ -355,6 +495,20 @@ def get_user_by_id(user_id: int):
     )
     
     
+@router.get("/parnterships/export")
+def export_partnership_proposals(
+    export: dict = Depends(export_options),
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] not in ("admin", "sub-admin"):
+        raise HTTPException(status_code=403, detail="Only admin can export proposals")
+
+    return stream_export(PARTNERSHIPS_QUERY, (), export["format"], "partnerships", export["itersize"])
+
 @router.get("/parnterships", response_model=List[PartnershipProposalResponse])
 def get_all_partnership_proposals(
     current_user_id: int = Depends(get_current_user)
@@ -366,9 +520,8 @@ def get_all_partnership_proposals(
     if not current_user or current_user["role"] not in ("admin", "sub-admin"):
         raise HTTPException(status_code=403, detail="Only admin can view proposals")
 
-    query = "SELECT * FROM partnership_proposals ORDER BY created_at DESC"
     with conn.cursor() as cur:
-        cur.execute(query)
+        cur.execute(PARTNERSHIPS_QUERY)
         proposals = cur.fetchall()
 
     return [
@@ -421,6 +574,20 @@ def update_post_status(
     
     
     
+@router.get("/admin/all-blogs/export")
+def export_all_guest_posts(
+    export: dict = Depends(export_options),
+    user_id: str = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user or user["role"] not in ["admin", "sub-admin"]:
+        raise HTTPException(status_code=403, detail="Only admin or sub-admin can export posts")
+
+    return stream_export(ALL_GUEST_POSTS_QUERY, (), export["format"], "guest_posts", export["itersize"])
+
 @router.get("/admin/all-blogs", response_model=List[dict])
 def get_all_guest_posts(
     user_id: str = Depends(get_current_user)
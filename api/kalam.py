@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, List
+from datetime import datetime
 from psycopg2.extras import RealDictCursor
 from db.connection import DBConnection
 from sql.combinedQueries import Queries
 from utils.jwt_handler import get_current_user
+from utils.vocalist_ranking import vocalist_ranker
+from utils.text_delta import unified_diff
+from utils.fieldsets import parse_fields
+from sql.queries.kalamQueries import KALAM_COLUMNS, SUBMISSION_REVIEW_TRANSITIONS
 
 router = APIRouter(
     prefix="/kalams",
@@ -35,6 +40,21 @@ class UpdateKalam(BaseModel):
 class AssignVocalist(BaseModel):
     vocalist_id: int
 
+class VocalistAssignment(BaseModel):
+    kalam_id: int
+    vocalist_id: int
+
+class BulkAssignVocalists(BaseModel):
+    assignments: List[VocalistAssignment]
+
+class VocalistAssignmentResult(BaseModel):
+    kalam_id: int
+    vocalist_id: int
+    result: str  # assigned, kalam_not_found, vocalist_not_found or invalid_status
+    status: Optional[str] = None
+
+MAX_BULK_ASSIGNMENTS = 500
+
 class UpdateYouTubeLink(BaseModel):
     youtube_link: str
 
@@ -45,6 +65,20 @@ class UpdateSubmissionStatus(BaseModel):
     new_status: str
     comments: Optional[str] = None
 
+# Bulk admin review
+class BulkSubmissionReview(BaseModel):
+    ids: List[int]
+    new_status: str
+    comments: Optional[str] = None
+
+class SubmissionReviewResult(BaseModel):
+    id: int
+    result: str  # updated, not_found or invalid_transition
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+
+MAX_BULK_REVIEW_IDS = 500
+
 class WriterResponse(BaseModel):
     user_approval_status: str
     writer_comments: Optional[str] = None
@@ -87,7 +121,7 @@ def create_kalam(data: CreateKalam, user_id: int = Depends(get_current_user)):
     }
 
 @router.get("/{id}")
-def get_kalam(id: int, user_id: int = Depends(get_current_user)):
+def get_kalam(id: int, fields: Optional[str] = None, user_id: int = Depends(get_current_user)):
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
@@ -95,7 +129,7 @@ def get_kalam(id: int, user_id: int = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    kalam = db.get_kalam_by_id(id)
+    kalam = db.get_kalam_by_id(id, parse_fields(fields, KALAM_COLUMNS, KALAM_COLUMNS))
     if not kalam:
         raise HTTPException(status_code=404, detail="Kalam not found")
 
@@ -138,6 +172,62 @@ def update_kalam(id: int, data: UpdateKalam, user_id: int = Depends(get_current_
 
     return {"message": "Kalam updated successfully", "kalam": updated_kalam}
 
+def get_kalam_for_revisions(db, id: int, user_id: int):
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    kalam = db.get_kalam_by_id(id)
+    if not kalam:
+        raise HTTPException(status_code=404, detail="Kalam not found")
+
+    if user["role"] not in ["admin", "sub-admin"] and not (user["role"] == "writer" and kalam["writer_id"] == int(user_id)):
+        raise HTTPException(status_code=403, detail="Not authorized to view this kalam's revisions")
+    return kalam
+
+@router.get("/{id}/revisions")
+def get_kalam_revisions(id: int, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    get_kalam_for_revisions(db, id, user_id)
+
+    return {"kalam_id": id, "revisions": db.get_kalam_revisions(id)}
+
+@router.get("/{id}/revisions/diff")
+def diff_kalam_revisions(
+    id: int,
+    from_revision: int = Query(..., ge=1),
+    to_revision: int = Query(..., ge=1),
+    user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    get_kalam_for_revisions(db, id, user_id)
+
+    old_text = db.get_kalam_revision_text(id, from_revision)
+    new_text = db.get_kalam_revision_text(id, to_revision)
+    if old_text is None or new_text is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+
+    return {
+        "kalam_id": id,
+        "from_revision": from_revision,
+        "to_revision": to_revision,
+        "diff": unified_diff(old_text, new_text, f"revision {from_revision}", f"revision {to_revision}")
+    }
+
+@router.get("/{id}/revisions/{revision}")
+def get_kalam_revision(id: int, revision: int, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    get_kalam_for_revisions(db, id, user_id)
+
+    kalam_text = db.get_kalam_revision_text(id, revision)
+    if kalam_text is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+
+    return {"kalam_id": id, "revision": revision, "kalam_text": kalam_text}
+
 @router.post("/{id}/assign-vocalist")
 def assign_vocalist(id: int, data: AssignVocalist, user_id: int = Depends(get_current_user)):
     conn = DBConnection.get_connection()
@@ -170,6 +260,55 @@ def assign_vocalist(id: int, data: AssignVocalist, user_id: int = Depends(get_cu
         "submission": submission
     }
 
+@router.post("/assign-vocalists")
+def bulk_assign_vocalists(data: BulkAssignVocalists, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user or user["role"] not in ["admin", "sub-admin"]:
+        raise HTTPException(status_code=403, detail="Only admins can assign vocalists")
+
+    if not data.assignments:
+        raise HTTPException(status_code=400, detail="No assignments provided")
+
+    if len(data.assignments) > MAX_BULK_ASSIGNMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ASSIGNMENTS} assignments per call")
+
+    kalam_ids = [a.kalam_id for a in data.assignments]
+    if len(set(kalam_ids)) != len(kalam_ids):
+        raise HTTPException(status_code=400, detail="Each kalam may appear only once")
+
+    results = db.bulk_assign_vocalists([(a.kalam_id, a.vocalist_id) for a in data.assignments])
+    return {
+        "assigned": sum(1 for r in results if r["result"] == "assigned"),
+        "results": [VocalistAssignmentResult(**r) for r in results]
+    }
+
+@router.get("/{id}/recommended-vocalists")
+def get_recommended_vocalists(id: int, limit: int = Query(10, ge=1, le=100), user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user or user["role"] not in ["admin", "sub-admin"]:
+        raise HTTPException(status_code=403, detail="Only admins can view vocalist recommendations")
+
+    kalam = db.get_kalam_by_id(id)
+    if not kalam:
+        raise HTTPException(status_code=404, detail="Kalam not found")
+
+    writer = db.get_user_by_id(kalam["writer_id"]) if kalam["writer_id"] else None
+
+    vocalist_ranker.refresh(db)
+    vocalists = vocalist_ranker.rank(kalam["language"], writer["country"] if writer else None, limit)
+
+    return {
+        "kalam_id": id,
+        "language": kalam["language"],
+        "vocalists": vocalists
+    }
+
 @router.post("/{id}/post-youtube-link")
 def update_youtube_link(id: int, data: UpdateYouTubeLink, user_id: int = Depends(get_current_user)):
     conn = DBConnection.get_connection()
@@ -246,6 +385,32 @@ def update_submission_status(id: int, sub_id: int, data: UpdateSubmissionStatus,
 
     return {"message": "Submission status updated successfully", "submission": updated_submission}
 
+@router.post("/submissions/review")
+def bulk_review_submissions(data: BulkSubmissionReview, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    if data.new_status == "admin_approved":
+        data.new_status = "final_approved"
+
+    user = db.get_user_by_id(user_id)
+    if not user or user["role"] not in ["admin", "sub-admin"]:
+        raise HTTPException(status_code=403, detail="Only admins can update submission status")
+
+    if data.new_status not in SUBMISSION_REVIEW_TRANSITIONS:
+        raise HTTPException(status_code=400, detail="Invalid status")
+
+    if not data.ids:
+        raise HTTPException(status_code=400, detail="No submission IDs provided")
+
+    if len(data.ids) > MAX_BULK_REVIEW_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_REVIEW_IDS} submissions per call")
+
+    results = db.bulk_review_submissions(data.ids, data.new_status, data.comments)
+    return {
+        "updated": sum(1 for r in results if r["result"] == "updated"),
+        "results": [SubmissionReviewResult(**r) for r in results]
+    }
+
 @router.post("/{id}/submissions/{sub_id}/writer-response")
 def writer_response(id: int, sub_id: int, data: WriterResponse, user_id: int = Depends(get_current_user)):
     conn = DBConnection.get_connection()
@@ -319,31 +484,32 @@ def writer_response(id: int, sub_id: int, data: WriterResponse, user_id: int = D
     
     
 @router.get("/writer/my-kalams")
-def get_my_kalams(user_id: int = Depends(get_current_user)):
+def get_my_kalams(
+    limit: int = Query(20, ge=1, le=100),
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    user_id: int = Depends(get_current_user)
+):
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
     user = db.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    print(user["role"])
     if user["role"] != "writer":
         raise HTTPException(status_code=403, detail="Only writers can view their own kalams")
 
-    kalams = db.get_kalams_by_writer_id(user_id)
-    if not kalams:
-        return {"message": "No kalams found for this writer", "kalams": []}
+    kalams = db.get_writer_kalam_summaries(user_id, after_created_at, after_id, limit)
+    if not kalams and after_id is None:
+        return {"message": "No kalams found for this writer", "kalams": [], "next_cursor": None}
 
-    # Fetch submissions for each kalam
-    kalam_list = []
-    for kalam in kalams:
-      
-        kalam_list.append({
-            "kalam": kalam,
-           
-        })
+    next_cursor = None
+    if len(kalams) == limit:
+        last = kalams[-1]
+        next_cursor = {"after_created_at": last["created_at"], "after_id": last["id"]}
 
     return {
         "message": "Kalams retrieved successfully",
-        "kalams": kalam_list
+        "kalams": kalams,
+        "next_cursor": next_cursor
     }
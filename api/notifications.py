@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
+import asyncio, json
 from db.connection import DBConnection
 from sql.combinedQueries import Queries
 from utils.jwt_handler import get_current_user
+from utils.notification_hub import notification_hub
+
+STREAM_KEEPALIVE_SECONDS = 25
+STREAM_RETRY_MS = 5000
 
 router = APIRouter(
     prefix="/notifications",
@@ -39,13 +47,71 @@ def create_notification(
     notification = db.create_notification(data.title, data.message, data.target_type, data.target_user_ids)
     return notification
 
+class MarkAllRead(BaseModel):
+    up_to_id: Optional[int] = None
+
+@router.get("/unread-count")
+def get_unread_count(
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    return {"unread_count": db.get_unread_count(current_user_id)}
+
+@router.post("/read-all")
+def mark_all_notifications_as_read(
+    data: Optional[MarkAllRead] = None,
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    marked = db.mark_all_as_read(current_user_id, data.up_to_id if data else None)
+    return {"message": "Notifications marked as read", "marked_count": marked}
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    current_user_id: int = Depends(get_current_user)
+):
+    """Server-Sent Events feed of new notifications for the current user."""
+    def load_user():
+        return Queries(DBConnection.get_connection()).get_user_by_id(current_user_id)
+
+    user = await run_in_threadpool(load_user)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    queue = await notification_hub.subscribe(current_user_id, user["role"])
+
+    async def event_stream():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            notification_hub.unsubscribe(current_user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/user/")
 def get_user_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     current_user_id: int = Depends(get_current_user)
 ):
     conn = DBConnection.get_connection()
     db = Queries(conn)
-    raw_notifications = db.get_user_notifications(current_user_id)
+    raw_notifications = db.get_user_notifications(current_user_id, limit, before_created_at, before_id)
 
     notifications = []
     for notif in raw_notifications:
@@ -59,7 +125,12 @@ def get_user_notifications(
             "read": notif[6]
         })
 
-    return {"notifications": notifications}
+    next_cursor = None
+    if len(notifications) == limit:
+        last = notifications[-1]
+        next_cursor = {"before_created_at": last["created_at"], "before_id": last["id"]}
+
+    return {"notifications": notifications, "next_cursor": next_cursor}
 
 @router.post("/{notification_id}/read/{user_id}")
 def mark_notification_as_read(
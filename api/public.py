@@ -4,6 +4,9 @@ from typing import List, Optional
 from db.connection import DBConnection
 from datetime import datetime
 from sql.combinedQueries import Queries
+from utils.suggest_index import suggest_index, SUGGEST_TOP_K
+from utils.fieldsets import parse_fields
+from sql.queries.kalamQueries import POSTED_KALAM_COLUMNS, POSTED_KALAM_SUMMARY_FIELDS
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
@@ -97,11 +100,45 @@ def create_partnership_proposal(
 def get_posted_kalams(
     skip: int = Query(0, ge=0),  # how many to skip
     limit: int = Query(4, ge=1),  # how many to fetch
+    fields: Optional[str] = None,  # comma-separated, or "all"; defaults to the card summary
 ):
     conn = DBConnection.get_connection()
     db = Queries(conn)
    
-    return db.fetch_posted_kalams(skip, limit)
+    selected = parse_fields(fields, POSTED_KALAM_COLUMNS, POSTED_KALAM_SUMMARY_FIELDS)
+    return db.fetch_posted_kalams(skip, limit, selected)
+
+
+
+
+@router.get("/kalams/search", response_model=List[dict])
+def search_kalams(
+    q: str = Query(..., min_length=1, max_length=200),
+    language: Optional[str] = None,
+    fuzzy: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    q = q.strip()
+    if fuzzy:
+        return db.lookup_posted_kalams(q, language, skip, limit)
+
+    results = db.search_posted_kalams(q, language, skip, limit)
+    # Misspelt or other-script queries find nothing in the tsvector; retry fuzzily
+    if not results and skip == 0:
+        results = db.lookup_posted_kalams(q, language, skip, limit)
+    return results
+
+
+@router.get("/suggest")
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(5, ge=1, le=SUGGEST_TOP_K),
+):
+    # Served from memory; the index refreshes itself in the background
+    return {"query": q, **suggest_index.suggest(q, limit)}
 
 
 
@@ -119,6 +156,38 @@ def get_vocalists(
 
 
 
+@router.get("/vocalists/discover")
+def discover_vocalists(
+    languages: Optional[List[str]] = Query(None),
+    vocal_range: Optional[str] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_facets: bool = True,
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    filters = {"languages": languages, "vocal_range": vocal_range, "country": country, "city": city}
+    vocalists = db.discover_vocalists(
+        **filters, after_created_at=after_created_at, after_id=after_id, limit=limit
+    )
+
+    next_cursor = None
+    if len(vocalists) == limit:
+        next_cursor = {"after_created_at": vocalists[-1]["created_at"], "after_id": vocalists[-1]["id"]}
+
+    # Facets describe the whole filtered set, so only the first page needs them
+    first_page = after_created_at is None or after_id is None
+    facets = db.vocalist_facets(**filters) if include_facets and first_page else None
+
+    return {"vocalists": vocalists, "next_cursor": next_cursor, "facets": facets}
+
+
+
+
 @router.get("/posts", response_model=List[dict])
 def get_guest_posts_paginated(
     skip: int = Query(0, ge=0),
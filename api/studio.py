@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional,Union
-from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional, Union
+from datetime import datetime, date, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
 from db.connection import DBConnection
 from utils.jwt_handler import get_current_user
 from sql.combinedQueries import Queries
@@ -48,6 +48,8 @@ class RemoteRecordingRequestCreate(BaseModel):
     city: Optional[str] = None
     country: Optional[str] = None
     time_zone: Optional[str] = None
+    preferred_date: Optional[date] = None
+    preferred_time: Optional[str] = None
     role: Optional[str] = None
     project_type: Optional[str] = None
     recording_equipment: Optional[str] = None
@@ -67,6 +69,8 @@ class RemoteRecordingRequestResponse(BaseModel):
     city: Optional[str]
     country: Optional[str]
     time_zone: Optional[str]
+    preferred_date: Optional[date] = None
+    preferred_time: Optional[str] = None
     role: Optional[str]
     project_type: Optional[str]
     recording_equipment: Optional[str]
@@ -80,6 +84,108 @@ class RemoteRecordingRequestResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+# Admin queue models: list views get the summary projection only
+class StudioVisitRequestSummary(BaseModel):
+    id: int
+    vocalist_id: int
+    kalam_id: int
+    name: str
+    email: str
+    preferred_date: Optional[date]
+    preferred_time: Optional[str]
+    number_of_visitors: Optional[Union[str, int]] = None
+    status: str
+    created_at: datetime
+
+class RemoteRecordingRequestSummary(BaseModel):
+    id: int
+    vocalist_id: int
+    kalam_id: int
+    name: str
+    email: str
+    city: Optional[str]
+    country: Optional[str]
+    preferred_date: Optional[date] = None
+    preferred_time: Optional[str] = None
+    project_type: Optional[str]
+    status: str
+    created_at: datetime
+
+class QueueCursor(BaseModel):
+    after_created_at: datetime
+    after_id: int
+
+class StudioVisitRequestPage(BaseModel):
+    items: List[StudioVisitRequestSummary]
+    next_cursor: Optional[QueueCursor] = None
+
+class RemoteRecordingRequestPage(BaseModel):
+    items: List[RemoteRecordingRequestSummary]
+    next_cursor: Optional[QueueCursor] = None
+
+REQUEST_STATUSES = ("pending", "approved", "rejected", "completed")
+
+def request_queue_filters(
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    vocalist_id: Optional[int] = None,
+    kalam_id: Optional[int] = None,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+) -> dict:
+    if status is not None and status not in REQUEST_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    return {
+        "status": status,
+        "created_from": created_from,
+        "created_to": created_to,
+        "vocalist_id": vocalist_id,
+        "kalam_id": kalam_id,
+        "after_created_at": after_created_at,
+        "after_id": after_id,
+        "limit": limit,
+    }
+
+def next_queue_cursor(rows: list, limit: int) -> Optional[QueueCursor]:
+    if len(rows) < limit:
+        return None
+    return QueueCursor(after_created_at=rows[-1]["created_at"], after_id=rows[-1]["id"])
+
+# Bulk status transitions
+class BulkRequestStatusUpdate(BaseModel):
+    ids: List[int]
+    status: str  # approved, rejected or completed
+    comments: Optional[str] = None
+
+class RequestStatusResult(BaseModel):
+    id: int
+    result: str  # updated, not_found or invalid_transition
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+
+MAX_BULK_STATUS_IDS = 500
+
+# Booking lookups for vocalist dashboards
+class BookingStatesRequest(BaseModel):
+    vocalist_id: int
+    kalam_ids: Optional[List[int]] = None  # defaults to every kalam assigned to the vocalist
+
+class BookingState(BaseModel):
+    kalam_id: int
+    is_booked: bool
+    request_type: Optional[str] = None  # 'studio' or 'remote'
+    request_id: Optional[int] = None
+    status: Optional[str] = None
+
+class BookingStatesResponse(BaseModel):
+    vocalist_id: int
+    kalams: List[BookingState]
+
+MAX_AVAILABILITY_DAYS = 62
+MAX_BATCH_KALAM_IDS = 500
+
 router = APIRouter(
     prefix="/requests",
     tags=["Requests"],
@@ -202,7 +308,170 @@ def check_request_exists(vocalist_id: int, kalam_id: int, user_id: int = Depends
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
-    studio_conflict = db.studio_request_exists(vocalist_id, kalam_id)
-    remote_conflict = db.remote_request_exists(vocalist_id, kalam_id)
+    states = db.get_booking_states(vocalist_id, [kalam_id])
+    return {"is_booked": bool(states and states[0]["is_booked"])}
+
+
+@router.post("/check-requests-exist", response_model=BookingStatesResponse)
+def check_requests_exist(data: BookingStatesRequest, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.get("role") not in ['admin', 'sub-admin'] and data.vocalist_id != int(user.get("id")):
+        raise HTTPException(status_code=403, detail="Vocalist ID must match authenticated user")
+
+    if data.kalam_ids is not None and len(data.kalam_ids) > MAX_BATCH_KALAM_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_KALAM_IDS} kalam IDs per request")
+
+    states = db.get_booking_states(data.vocalist_id, data.kalam_ids)
+    return BookingStatesResponse(
+        vocalist_id=data.vocalist_id,
+        kalams=[BookingState(**state) for state in states]
+    )
+
+
+@router.get("/availability")
+def get_availability(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    kind: str = Query("studio"),
+    user_id: int = Depends(get_current_user)
+):
+    if kind not in ("studio", "remote"):
+        raise HTTPException(status_code=400, detail="kind must be 'studio' or 'remote'")
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_AVAILABILITY_DAYS} days")
+
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    now = datetime.now(timezone.utc)
+    availability = db.get_availability(kind, from_date, to_date)
+    return {
+        "kind": kind,
+        "from": from_date,
+        "to": to_date,
+        "days": [
+            {"date": day, "slots": [slot for slot in slots if slot["start"] > now]}
+            for day, slots in availability.items()
+        ]
+    }
+
+
+@router.get("/studio-visit-requests/queue", response_model=StudioVisitRequestPage)
+def get_studio_visit_request_queue(
+    filters: dict = Depends(request_queue_filters),
+    user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.get("role") not in ['admin','sub-admin']:
+        raise HTTPException(status_code=403, detail="Only admins can view all studio visit requests")
+
+    rows = db.get_request_queue("studio", **filters)
+    return StudioVisitRequestPage(
+        items=[StudioVisitRequestSummary(**row) for row in rows],
+        next_cursor=next_queue_cursor(rows, filters["limit"])
+    )
+
+@router.get("/remote-recording-requests/queue", response_model=RemoteRecordingRequestPage)
+def get_remote_recording_request_queue(
+    filters: dict = Depends(request_queue_filters),
+    user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.get("role") not in ['admin','sub-admin']:
+        raise HTTPException(status_code=403, detail="Only admins can view all remote recording requests")
+
+    rows = db.get_request_queue("remote", **filters)
+    return RemoteRecordingRequestPage(
+        items=[RemoteRecordingRequestSummary(**row) for row in rows],
+        next_cursor=next_queue_cursor(rows, filters["limit"])
+    )
+
+def bulk_update_status(kind: str, data: BulkRequestStatusUpdate, user_id: int) -> dict:
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.get("role") not in ['admin','sub-admin']:
+        raise HTTPException(status_code=403, detail="Only admins can update request status")
+
+    if data.status not in ("approved", "rejected", "completed"):
+        raise HTTPException(status_code=400, detail="Status must be 'approved', 'rejected' or 'completed'")
+
+    if not data.ids:
+        raise HTTPException(status_code=400, detail="No request IDs provided")
+
+    if len(data.ids) > MAX_BULK_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_STATUS_IDS} requests per call")
+
+    results = db.bulk_update_request_status(kind, data.ids, data.status, data.comments)
+    return {
+        "updated": sum(1 for r in results if r["result"] == "updated"),
+        "results": [RequestStatusResult(**r) for r in results]
+    }
+
+@router.post("/studio-visit-requests/status")
+def bulk_update_studio_visit_status(data: BulkRequestStatusUpdate, user_id: int = Depends(get_current_user)):
+    return bulk_update_status("studio", data, user_id)
+
+@router.post("/remote-recording-requests/status")
+def bulk_update_remote_recording_status(data: BulkRequestStatusUpdate, user_id: int = Depends(get_current_user)):
+    return bulk_update_status("remote", data, user_id)
+
+@router.get("/studio-visit-requests/{request_id}", response_model=StudioVisitRequestResponse)
+def get_studio_visit_request(request_id: int, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    request = db.get_studio_visit_request_by_id(request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Studio visit request not found")
+
+    if user.get("role") not in ['admin','sub-admin'] and request["vocalist_id"] != int(user.get("id")):
+        raise HTTPException(status_code=403, detail="Not authorized to view this request")
+
+    return StudioVisitRequestResponse(**request)
+
+@router.get("/remote-recording-requests/{request_id}", response_model=RemoteRecordingRequestResponse)
+def get_remote_recording_request(request_id: int, user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    request = db.get_remote_recording_request_by_id(request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Remote recording request not found")
+
+    if user.get("role") not in ['admin','sub-admin'] and request["vocalist_id"] != int(user.get("id")):
+        raise HTTPException(status_code=403, detail="Not authorized to view this request")
 
-    return {"is_booked": studio_conflict or remote_conflict}
+    return RemoteRecordingRequestResponse(**request)
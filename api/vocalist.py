@@ -4,6 +4,8 @@ from typing import List,Optional
 from db.connection import DBConnection
 from sql.combinedQueries import Queries
 from utils.jwt_handler import get_current_user
+from utils.fieldsets import parse_fields
+from sql.queries.vocalistQueries import VOCALIST_KALAM_COLUMNS, VOCALIST_KALAM_SUMMARY_FIELDS
 
 router = APIRouter(
     prefix="/vocalists",
@@ -32,33 +34,20 @@ def submit_vocalist_profile(data: SubmitVocalistProfile, user_id: int = Depends(
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
-    existing = db.get_vocalist_by_user_id(user_id)
-    if existing:
-        db.update_vocalist_profile(
-            user_id=user_id,
-            vocal_range=data.vocal_range,
-            languages=data.languages,
-            sample_title=data.sample_title,
-            audio_sample_url=data.audio_sample_url,
-            sample_description=data.sample_description,
-            experience_background=data.experience_background,
-            portfolio=data.portfolio,
-            availability=data.availability
-        )
-        return {"message": "Vocalist profile updated successfully"}
-    else:
-        db.create_vocalist_profile(
-            user_id=user_id,
-            vocal_range=data.vocal_range,
-            languages=data.languages,
-            sample_title=data.sample_title,
-            audio_sample_url=data.audio_sample_url,
-            sample_description=data.sample_description,
-            experience_background=data.experience_background,
-            portfolio=data.portfolio,
-            availability=data.availability
-        )
+    profile = db.upsert_vocalist_profile(
+        user_id=user_id,
+        vocal_range=data.vocal_range,
+        languages=data.languages,
+        sample_title=data.sample_title,
+        audio_sample_url=data.audio_sample_url,
+        sample_description=data.sample_description,
+        experience_background=data.experience_background,
+        portfolio=data.portfolio,
+        availability=data.availability
+    )
+    if profile["inserted"]:
         return {"message": "Vocalist profile submitted successfully"}
+    return {"message": "Vocalist profile updated successfully"}
 
 @router.get("/get/{vocalist_id}")
 def get_vocalist_profile(
@@ -99,7 +88,7 @@ def check_vocalist_registration(user_id: int = Depends(get_current_user)):
 
 
 @router.get("/kalams")
-def get_kalams_by_vocalist(current_user_id: int = Depends(get_current_user)):
+def get_kalams_by_vocalist(fields: Optional[str] = None, current_user_id: int = Depends(get_current_user)):
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
@@ -112,10 +101,25 @@ def get_kalams_by_vocalist(current_user_id: int = Depends(get_current_user)):
 
     
 
-    kalams = db.get_kalams_by_vocalist_id(current_user_id)
+    selected = parse_fields(fields, VOCALIST_KALAM_COLUMNS, VOCALIST_KALAM_SUMMARY_FIELDS)
+    kalams = db.get_kalams_by_vocalist_id(current_user_id, selected)
     return {"vocalist_id": current_user_id, "kalams": kalams}
 
 
+@router.get("/me/stats")
+def get_my_vocalist_stats(current_user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(current_user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user["role"] != "vocalist":
+        raise HTTPException(status_code=403, detail="Only vocalists can view vocalist stats")
+
+    return db.get_vocalist_stats(current_user_id)
+
+
 @router.post("/kalam/{kalam_id}/approval")
 def approve_or_reject_kalam(
     kalam_id: int,
@@ -29,29 +29,18 @@ def submit_writer_profile(data: SubmitWriterProfile, user_id: int = Depends(get_
     conn = DBConnection.get_connection()
     db = Queries(conn)
 
-    existing = db.get_writer_by_user_id(user_id)
-    if existing:
-        db.update_writer_profile(
-            user_id=user_id,
-            writing_styles=data.writing_styles,
-            languages=data.languages,
-            sample_title=data.sample_title,
-            experience_background=data.experience_background,
-            portfolio=data.portfolio,
-            availability=data.availability
-        )
-        return {"message": "Writer profile updated successfully"}
-    else:
-        db.create_writer_profile(
-            user_id=user_id,
-            writing_styles=data.writing_styles,
-            languages=data.languages,
-            sample_title=data.sample_title,
-            experience_background=data.experience_background,
-            portfolio=data.portfolio,
-            availability=data.availability
-        )
+    profile = db.upsert_writer_profile(
+        user_id=user_id,
+        writing_styles=data.writing_styles,
+        languages=data.languages,
+        sample_title=data.sample_title,
+        experience_background=data.experience_background,
+        portfolio=data.portfolio,
+        availability=data.availability
+    )
+    if profile["inserted"]:
         return {"message": "Writer profile submitted successfully"}
+    return {"message": "Writer profile updated successfully"}
 
 
 @router.get("/get/{writer_id}")
@@ -92,3 +81,16 @@ def check_writer_registration(user_id: int = Depends(get_current_user)):
 
 
 
+
+@router.get("/me/stats")
+def get_my_writer_stats(user_id: int = Depends(get_current_user)):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+
+    user = db.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user["role"] != "writer":
+        raise HTTPException(status_code=403, detail="Only writers can view writer stats")
+
+    return db.get_writer_stats(user_id)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from db.connection import DBConnection
 from utils.jwt_handler import get_current_user
 from sql.combinedQueries import Queries
+from utils.youtube_cache import youtube_cache
 import os, re, requests
 from dotenv import load_dotenv
 from datetime import datetime
@@ -34,17 +35,32 @@ class VideoBase(BaseModel):
     tags: Optional[List[str]] = []
     
 class VideoResponse(VideoBase):
-    pass
+    kalam_id: Optional[int] = None
+    writer_id: Optional[int] = None
+    vocalist_id: Optional[int] = None
 
 
 # ============================
 # Utility Functions
 # ============================
 def fetch_from_youtube(url: str) -> dict:
-    resp = requests.get(url)
+    cached = youtube_cache.get(url)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+
+    resp = requests.get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        youtube_cache.record(url, not_modified=True)
+        youtube_cache.touch(url)
+        return cached["body"]
     if resp.status_code != 200:
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
-    return resp.json()
+
+    youtube_cache.record(url, not_modified=False)
+    data = resp.json()
+    etag = resp.headers.get("ETag") or data.get("etag")
+    if etag:
+        youtube_cache.put(url, etag, data)
+    return data
 
 def fetch_video_duration(video_id: str) -> str:
     url = f"https://www.googleapis.com/youtube/v3/videos?part=contentDetails&id={video_id}&key={YOUTUBE_API_KEY}"
@@ -148,6 +164,9 @@ def fetch_and_store():
                     db.upsert_youtube_video(processed, cur=cur)
                     videos.append(processed)
 
+                # 4. Refresh the video-to-kalam mapping in the same transaction
+                db.sync_youtube_video_links(cur=cur)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transaction failed: {e}")
 
@@ -164,6 +183,20 @@ def get_videos():
 
 
 
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user_id: int = Depends(get_current_user)
+):
+    conn = DBConnection.get_connection()
+    db = Queries(conn)
+    current_user = db.get_user_by_id(current_user_id)
+
+    if not current_user or current_user["role"] not in ("admin", "sub-admin"):
+        raise HTTPException(status_code=403, detail="Only admin can view cache stats")
+
+    return youtube_cache.get_stats()
+
+
 @router.get("/videos-limited", response_model=List[VideoResponse])
 def get_limited_videos():
     conn = DBConnection.get_connection()
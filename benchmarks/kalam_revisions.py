@@ -0,0 +1,145 @@
+"""
+Benchmark kalam revision storage and reconstruction.
+
+Loads schema.sql into a throwaway schema, creates one long kalam (default
+2000 lines) and edits it N times (default 300) through
+KalamQueries.update_kalam, a few lines per edit. Reports the stored size
+against keeping every version in full, then times
+KalamQueries.get_kalam_revision_text for the latest revision, the worst
+case (the last delta before a snapshot) and random revisions.
+
+    DATABASE_URL=postgresql://... python benchmarks/kalam_revisions.py [--lines 2000] [--revisions 300] [--interval 10] [--runs 50] [--keep]
+
+The schema is dropped afterwards unless --keep is given.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sql.queries import kalamQueries  # noqa: E402
+from sql.queries.kalamQueries import KalamQueries  # noqa: E402
+
+BENCH_SCHEMA = "bench_kalam_revisions"
+
+WORDS = [
+    "ishq", "dil", "yaar", "mehboob", "rooh", "noor", "fana", "baqa", "saqi", "jaam",
+    "dard", "sajda", "qalandar", "murshid", "darvesh", "khuda", "haq", "sufi", "wajd", "sama",
+]
+
+
+def verse_line(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 10))) + "\n"
+
+
+def edit(lines, rng: random.Random):
+    """A writer's round of changes: rewrite, add or drop a few lines."""
+    lines = list(lines)
+    for _ in range(rng.randint(1, 4)):
+        i = rng.randrange(len(lines))
+        action = rng.random()
+        if action < 0.6:
+            lines[i] = verse_line(rng)
+        elif action < 0.8:
+            lines.insert(i, verse_line(rng))
+        elif len(lines) > 1:
+            del lines[i]
+    return lines
+
+
+def load_history(conn, line_count: int, revisions: int):
+    schema_sql = open(os.path.join(os.path.dirname(__file__), "..", "schema.sql")).read()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        cur.execute(f"CREATE SCHEMA {BENCH_SCHEMA};")
+        cur.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+        cur.execute(schema_sql)
+        cur.execute("""
+            INSERT INTO users (email, name, password_hash, role, country, city)
+            VALUES ('writer@bench', 'Writer', 'x', 'writer', 'PK', 'Lahore')
+            RETURNING id;
+        """)
+        writer_id = cur.fetchone()[0]
+    conn.commit()
+
+    rng = random.Random(42)
+    db = KalamQueries(conn)
+    lines = [verse_line(rng) for _ in range(line_count)]
+    kalam = db.create_kalam("Bench", "Urdu", "fana", "".join(lines), "d", "s", "qawwali", writer_id)
+    full_bytes = len("".join(lines).encode())
+    for _ in range(revisions - 1):
+        lines = edit(lines, rng)
+        db.update_kalam(kalam["id"], kalam_text="".join(lines))
+        full_bytes += len("".join(lines).encode())
+    return kalam["id"], "".join(lines), full_bytes
+
+
+def timed(db, kalam_id: int, revisions, runs: int):
+    timings = []
+    for _ in range(runs):
+        revision = random.choice(revisions)
+        start = time.perf_counter()
+        db.get_kalam_revision_text(kalam_id, revision)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, timings[-1]
+
+
+def run(conn, kalam_id: int, latest_text: str, full_bytes: int, runs: int):
+    db = KalamQueries(conn)
+    history = db.get_kalam_revisions(kalam_id)
+    stored = sum(row["stored_bytes"] for row in history)
+    snapshots = sum(1 for row in history if row["is_snapshot"])
+    print(f"{len(history)} revisions, {snapshots} snapshots")
+    print(f"stored {stored / 1024:.0f} KiB vs {full_bytes / 1024:.0f} KiB as full copies ({full_bytes / stored:.1f}x smaller)")
+
+    latest = history[-1]["revision"]
+    assert db.get_kalam_revision_text(kalam_id, latest) == latest_text
+
+    snapshot_revisions = [row["revision"] for row in history if row["is_snapshot"]]
+    worst = [r - 1 for r in snapshot_revisions[1:]] or [latest]
+    cases = [
+        ("latest", [latest]),
+        ("last before snapshot", worst),
+        ("random", [row["revision"] for row in history]),
+    ]
+    print(f"{'revision':<22} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for label, revisions in cases:
+        p50, p95, worst_ms = timed(db, kalam_id, revisions, runs)
+        print(f"{label:<22} {p50:>8.2f} {p95:>8.2f} {worst_ms:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--revisions", type=int, default=300)
+    parser.add_argument("--interval", type=int, default=kalamQueries.REVISION_SNAPSHOT_INTERVAL,
+                        help="snapshot every N revisions")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {BENCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+    kalamQueries.REVISION_SNAPSHOT_INTERVAL = args.interval
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        start = time.perf_counter()
+        kalam_id, latest_text, full_bytes = load_history(conn, args.lines, args.revisions)
+        print(f"wrote {args.revisions} revisions of {args.lines} lines in {time.perf_counter() - start:.1f}s")
+        run(conn, kalam_id, latest_text, full_bytes, args.runs)
+    finally:
+        if not args.keep:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark /public/kalams/search on a synthetic corpus.
+
+Loads schema.sql into a throwaway schema, generates N posted kalams
+(default 100k) in Urdu, Punjabi and English, then times
+KalamQueries.search_posted_kalams for a handful of typical queries.
+
+    DATABASE_URL=postgresql://... python benchmarks/kalam_search.py [--kalams 100000] [--runs 50] [--keep]
+
+The schema is dropped afterwards unless --keep is given.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from sql.queries.kalamQueries import KalamQueries  # noqa: E402
+
+BENCH_SCHEMA = "bench_kalam_search"
+
+ROMAN_URDU_WORDS = [
+    "ishq", "dil", "yaar", "mehboob", "rooh", "noor", "fana", "baqa", "saqi", "jaam",
+    "dard", "sajda", "qalandar", "murshid", "darvesh", "khuda", "haq", "sufi", "wajd", "sama",
+    "chaand", "raat", "sehra", "dariya", "aansu", "ghazal", "naat", "manqabat", "dhamaal", "mast",
+    "lal", "shahbaz", "bulleh", "shah", "heer", "ranjha", "jogi", "tasbeeh", "zikr", "wisaal",
+]
+ENGLISH_WORDS = [
+    "love", "beloved", "soul", "light", "heart", "longing", "union", "separation", "wine", "tavern",
+    "dervish", "whirling", "moon", "night", "desert", "river", "tears", "prayer", "devotion", "ecstasy",
+    "journey", "seeker", "truth", "mystic", "silence", "remembrance", "flame", "moth", "garden", "rose",
+]
+SYLLABLES = ["ka", "ra", "mi", "lo", "sha", "be", "du", "na", "ti", "gu",
+             "ze", "po", "ha", "ya", "qi", "fo", "ne", "sa", "ju", "wa"]
+
+
+def vocabulary(words):
+    """
+    Named words spread through a long tail of filler words. Words are drawn
+    log-uniformly by rank (roughly Zipf), so the named words range from
+    very common (rank 10) to rare (rank ~3000), like real verse.
+    """
+    filler = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+    vocab = list(filler)
+    for i, word in enumerate(words):
+        vocab.insert(10 + i * i * 2, word)
+    return vocab
+
+
+QUERIES = [
+    ("single common word", "ishq", None),
+    ("two words", "dil mehboob", None),
+    ("phrase", '"ishq dil"', None),
+    ("rare word", "wisaal", None),
+    ("english stemmed", "longing hearts", "English"),
+    ("language filter", "noor", "Punjabi"),
+    ("or query", "sehra or dariya", None),
+]
+
+
+def load_corpus(conn, kalams: int):
+    schema_sql = open(os.path.join(os.path.dirname(__file__), "..", "schema.sql")).read()
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        cur.execute(f"CREATE SCHEMA {BENCH_SCHEMA};")
+        cur.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+        cur.execute(schema_sql)
+        cur.execute("""
+            INSERT INTO users (email, name, password_hash, role, country, city)
+            SELECT 'writer' || g || '@bench', 'Writer ' || g, 'x', 'writer', 'PK', 'Lahore'
+            FROM generate_series(1, 500) AS g;
+        """)
+        cur.execute("""
+            CREATE FUNCTION bench_words(words TEXT[], n INT) RETURNS TEXT
+            LANGUAGE SQL VOLATILE AS $$
+                SELECT string_agg(words[floor(exp(random() * ln(array_length(words, 1))))::int], ' ')
+                FROM generate_series(1, n)
+            $$;
+        """)
+        cur.execute("""
+            INSERT INTO kalams (title, language, theme, kalam_text, description, sufi_influence,
+                                musical_preference, writer_id, created_at, published_at)
+            SELECT
+                bench_words(w, 3 + g %% 3),
+                lang,
+                bench_words(w, 2 + g %% 2),
+                bench_words(w, 60 + g %% 40),
+                bench_words(w, 15 + g %% 10),
+                bench_words(w, 2 + g %% 2),
+                'qawwali',
+                1 + g %% 500,
+                now() - make_interval(mins => g),
+                now() - make_interval(mins => g)
+            FROM (
+                SELECT g,
+                       CASE WHEN g %% 4 = 0 THEN 'English' WHEN g %% 4 = 1 THEN 'Punjabi' ELSE 'Urdu' END AS lang,
+                       CASE WHEN g %% 4 = 0 THEN %s::text[] ELSE %s::text[] END AS w
+                FROM generate_series(1, %s) AS g
+            ) src;
+        """, (vocabulary(ENGLISH_WORDS), vocabulary(ROMAN_URDU_WORDS), kalams))
+        cur.execute("""
+            INSERT INTO kalam_submissions (kalam_id, status, user_approval_status, vocalist_approval_status)
+            SELECT id, 'posted', 'approved', 'approved' FROM kalams;
+        """)
+        cur.execute("ANALYZE;")
+    conn.commit()
+
+
+def run(conn, runs: int):
+    db = KalamQueries(conn)
+    print(f"{'query':<22} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for label, q, language in QUERIES:
+        timings = []
+        hits = 0
+        for _ in range(runs):
+            start = time.perf_counter()
+            rows = db.search_posted_kalams(q, language, 0, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits = len(rows)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{label:<22} {hits:>5} {statistics.median(timings):>8.2f} {p95:>8.2f} {timings[-1]:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kalams", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {BENCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        start = time.perf_counter()
+        load_corpus(conn, args.kalams)
+        print(f"loaded {args.kalams} kalams in {time.perf_counter() - start:.1f}s")
+        with conn.cursor() as cur:
+            cur.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+        run(conn, args.runs)
+    finally:
+        if not args.keep:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api import auth_router,user_router,admin_router,vocalist_router,kalam_router,studio_router,notification_router,public_router,writer_router,youtube_router
-app = FastAPI(title="My App")
+from sql.combinedQueries import Queries
+from utils.suggest_index import suggest_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Type-ahead index builds and refreshes off the request path
+    suggest_index.start(Queries)
+    yield
+
+
+app = FastAPI(title="My App", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],          # Or ["*"] to allow all
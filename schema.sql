@@ -22,6 +22,7 @@ CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_users_country_city ON users(country, city);
 CREATE INDEX idx_users_created_at ON users(created_at);
+CREATE INDEX idx_users_updated_at ON users(updated_at);
 
 -- =========================
 -- VOCALISTS
@@ -38,6 +39,7 @@ CREATE TABLE vocalists (
     portfolio TEXT,
     availability TEXT,
     status VARCHAR(50) CHECK (status IN ('pending', 'approved', 'rejected')) DEFAULT 'pending',
+    assignments_rejected INT NOT NULL DEFAULT 0,  -- kalam assignments this vocalist turned down
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -46,6 +48,12 @@ CREATE TABLE vocalists (
 CREATE INDEX idx_vocalists_user_id ON vocalists(user_id);
 CREATE INDEX idx_vocalists_status ON vocalists(status);
 CREATE INDEX idx_vocalists_created_at ON vocalists(created_at);
+CREATE INDEX idx_vocalists_updated_at ON vocalists(updated_at);
+
+-- Public discovery only ever reads approved vocalists
+CREATE INDEX idx_vocalists_approved_created ON vocalists(created_at DESC, id DESC) WHERE status = 'approved';
+CREATE INDEX idx_vocalists_approved_languages ON vocalists USING gin (languages) WHERE status = 'approved';
+CREATE INDEX idx_vocalists_approved_range ON vocalists(vocal_range) WHERE status = 'approved';
 
 
 CREATE TABLE writers (
@@ -77,10 +85,22 @@ CREATE TABLE kalams (
     writer_id INT REFERENCES users(id),
     vocalist_id INT REFERENCES vocalists(id),
     published_at TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_kalams_vocalist_id ON kalams(vocalist_id);
+-- Writer dashboards page through their own kalams newest first
+CREATE INDEX idx_kalams_writer_created ON kalams(writer_id, created_at DESC, id DESC);
+-- /public/suggest refreshes from updated_at watermarks
+CREATE INDEX idx_kalams_updated_at ON kalams(updated_at, id);
+-- Admin kalam browser's "recently_updated" sort
+CREATE INDEX idx_kalams_recently_updated ON kalams(COALESCE(updated_at, created_at) DESC, id DESC);
+-- Admin kalam browser sorts and filters
+CREATE INDEX idx_kalams_created ON kalams(created_at DESC, id DESC);
+CREATE INDEX idx_kalams_title ON kalams(title, id);
+CREATE INDEX idx_kalams_language_created ON kalams(lower(language), created_at DESC, id DESC);
+CREATE INDEX idx_kalams_theme ON kalams(lower(theme));
 
 
 CREATE TABLE kalam_submissions (
@@ -106,10 +126,151 @@ CREATE TABLE kalam_submissions (
     ) DEFAULT 'pending',
     admin_comments TEXT,
     writer_comments TEXT,
+    -- Probable earlier copy of this kalam, see KALAM NEAR-DUPLICATES
+    duplicate_of INT REFERENCES kalams(id) ON DELETE SET NULL,
+    duplicate_similarity REAL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_kalam_submissions_kalam_id ON kalam_submissions(kalam_id);
+CREATE INDEX idx_kalam_submissions_updated_at ON kalam_submissions(updated_at);
+CREATE INDEX idx_kalam_submissions_status ON kalam_submissions(status, kalam_id);
+
+
+-- =========================
+-- KALAM SEARCH
+-- =========================
+-- One weighted tsvector per kalam, kept in sync by triggers so SELECT * on
+-- kalams stays lean. English kalams are stemmed; Urdu, Punjabi and the rest
+-- have no Postgres dictionary and are indexed with the 'simple' config.
+-- language and posted are copied here so a search never leaves this table
+-- until the final page is known.
+--
+-- normalized_text and transliteration_keys are written by the application
+-- (utils/script_normalization.py) on create/update: diacritic-folded tokens
+-- and a script-independent consonant key per token, so "ishaq", "ishq" and
+-- "عشق" meet in one trigram index.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE kalam_search_documents (
+    kalam_id INT PRIMARY KEY REFERENCES kalams(id) ON DELETE CASCADE,
+    config REGCONFIG NOT NULL,
+    language TEXT,
+    posted BOOLEAN NOT NULL DEFAULT FALSE,
+    search_vector TSVECTOR NOT NULL,
+    normalized_text TEXT NOT NULL DEFAULT '',
+    transliteration_keys TEXT NOT NULL DEFAULT ''
+);
+
+-- Only posted kalams are searchable
+CREATE INDEX idx_kalam_search_documents_vector ON kalam_search_documents USING GIN (search_vector) WHERE posted;
+CREATE INDEX idx_kalam_search_documents_normalized ON kalam_search_documents
+    USING GIN (normalized_text gin_trgm_ops) WHERE posted;
+CREATE INDEX idx_kalam_search_documents_keys ON kalam_search_documents
+    USING GIN (transliteration_keys gin_trgm_ops) WHERE posted;
+
+CREATE FUNCTION kalam_search_config(language TEXT) RETURNS REGCONFIG
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN lower(btrim(language)) = 'english' THEN 'english'::regconfig ELSE 'simple'::regconfig END
+$$;
+
+CREATE FUNCTION kalam_search_vector(
+    config REGCONFIG, title TEXT, theme TEXT, sufi_influence TEXT, description TEXT, kalam_text TEXT
+) RETURNS TSVECTOR
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector(config, coalesce(title, '')), 'A')
+        || setweight(to_tsvector(config, coalesce(theme, '') || ' ' || coalesce(sufi_influence, '')), 'B')
+        || setweight(to_tsvector(config, coalesce(description, '')), 'C')
+        || setweight(to_tsvector(config, coalesce(kalam_text, '')), 'D')
+$$;
+
+CREATE FUNCTION refresh_kalam_search_document() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO kalam_search_documents (kalam_id, config, language, search_vector)
+    VALUES (
+        NEW.id,
+        kalam_search_config(NEW.language),
+        lower(btrim(NEW.language)),
+        kalam_search_vector(kalam_search_config(NEW.language), NEW.title, NEW.theme,
+                            NEW.sufi_influence, NEW.description, NEW.kalam_text)
+    )
+    ON CONFLICT (kalam_id) DO UPDATE
+    SET config = EXCLUDED.config, language = EXCLUDED.language, search_vector = EXCLUDED.search_vector;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_kalams_search_document
+AFTER INSERT OR UPDATE OF title, theme, sufi_influence, description, kalam_text, language ON kalams
+FOR EACH ROW EXECUTE FUNCTION refresh_kalam_search_document();
+
+CREATE FUNCTION refresh_kalam_search_posted() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE kalam_search_documents SET posted = FALSE WHERE kalam_id = OLD.kalam_id AND posted;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        UPDATE kalam_search_documents SET posted = (NEW.status = 'posted') WHERE kalam_id = NEW.kalam_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_kalam_submissions_search_posted
+AFTER INSERT OR DELETE OR UPDATE OF status, kalam_id ON kalam_submissions
+FOR EACH ROW EXECUTE FUNCTION refresh_kalam_search_posted();
+
+
+-- =========================
+-- KALAM NEAR-DUPLICATES
+-- =========================
+-- MinHash signature of each kalam_text (utils/minhash.py), written by the
+-- application on create/update. bands holds one LSH bucket hash per band;
+-- kalams sharing any bucket are candidates, so a lookup is one GIN probe
+-- instead of a scan. Kalams created before this table existed are filled
+-- in by POST /admin/kalams/near-duplicates/scan.
+CREATE TABLE kalam_minhash (
+    kalam_id INT PRIMARY KEY REFERENCES kalams(id) ON DELETE CASCADE,
+    signature INT[] NOT NULL,
+    bands BIGINT[] NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_kalam_minhash_bands ON kalam_minhash USING GIN (bands);
+
+-- Estimated Jaccard similarity: the share of signature positions that agree
+CREATE FUNCTION minhash_similarity(a INT[], b INT[]) RETURNS REAL
+LANGUAGE SQL IMMUTABLE PARALLEL SAFE AS $$
+    SELECT count(*) FILTER (WHERE x = y)::real / greatest(cardinality(a), 1)
+    FROM unnest(a, b) AS s(x, y)
+$$;
+
+
+-- =========================
+-- KALAM REVISIONS
+-- =========================
+-- kalam_text history. Revision 1 and every REVISION_SNAPSHOT_INTERVAL-th
+-- revision after it hold the full text; the rest hold line edits against
+-- the previous revision (utils/text_delta.py), so reading any revision
+-- replays at most one interval of deltas. Kalams edited before this table
+-- existed get their pre-edit text as revision 1 on the first edit.
+CREATE TABLE kalam_revisions (
+    kalam_id INT NOT NULL REFERENCES kalams(id) ON DELETE CASCADE,
+    revision INT NOT NULL,
+    snapshot TEXT,
+    delta JSONB,
+    -- Submission status when the edit was made, to line revisions up with review rounds
+    submission_status VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (kalam_id, revision),
+    CHECK ((snapshot IS NULL) <> (delta IS NULL))
+);
+
+CREATE INDEX idx_kalam_revisions_snapshots ON kalam_revisions(kalam_id, revision) WHERE snapshot IS NOT NULL;
+
 
 -- =========================
 -- STUDIO VISIT REQUESTS
@@ -124,6 +285,7 @@ CREATE TABLE studio_visit_requests (
     contact_number VARCHAR(50),
     preferred_date DATE,
     preferred_time VARCHAR(50),
+    slot TSTZRANGE,  -- normalized from preferred_date/preferred_time
     purpose TEXT,
     number_of_visitors INT,
     additional_details TEXT,
@@ -134,10 +296,21 @@ CREATE TABLE studio_visit_requests (
 );
 
 -- Recommended Indexes
-CREATE INDEX idx_studio_visit_vocalist_id ON studio_visit_requests(vocalist_id);
+CREATE INDEX idx_studio_visit_vocalist_kalam ON studio_visit_requests(vocalist_id, kalam_id);
 CREATE INDEX idx_studio_visit_kalam_id ON studio_visit_requests(kalam_id);
-CREATE INDEX idx_studio_visit_status ON studio_visit_requests(status);
-CREATE INDEX idx_studio_visit_created_at ON studio_visit_requests(created_at);
+CREATE INDEX idx_studio_visit_status ON studio_visit_requests(status, created_at DESC, id DESC);
+CREATE INDEX idx_studio_visit_created_at ON studio_visit_requests(created_at DESC, id DESC);
+
+-- Two active bookings can never overlap; INSERT ... ON CONFLICT DO NOTHING
+-- reports the clash instead of a racy SELECT EXISTS pre-check.
+ALTER TABLE studio_visit_requests ADD CONSTRAINT excl_studio_visit_slot
+    EXCLUDE USING gist (slot WITH &&)
+    WHERE (slot IS NOT NULL AND status IN ('pending', 'approved'));
+
+-- Fallback for preferred_time text that can't be parsed into a range
+CREATE UNIQUE INDEX uq_studio_visit_text_slot
+    ON studio_visit_requests (preferred_date, lower(btrim(preferred_time)))
+    WHERE slot IS NULL AND status IN ('pending', 'approved');
 
 -- =========================
 -- REMOTE RECORDING REQUESTS
@@ -151,6 +324,9 @@ CREATE TABLE remote_recording_requests (
     city VARCHAR(100),
     country VARCHAR(100),
     time_zone VARCHAR(100),
+    preferred_date DATE,
+    preferred_time VARCHAR(50),
+    slot TSTZRANGE,  -- normalized from preferred_date/preferred_time
     role VARCHAR(100),
     project_type VARCHAR(100),
     recording_equipment TEXT,
@@ -166,10 +342,18 @@ CREATE TABLE remote_recording_requests (
 );
 
 -- Recommended Indexes
-CREATE INDEX idx_remote_recording_vocalist_id ON remote_recording_requests(vocalist_id);
+CREATE INDEX idx_remote_recording_vocalist_kalam ON remote_recording_requests(vocalist_id, kalam_id);
 CREATE INDEX idx_remote_recording_kalam_id ON remote_recording_requests(kalam_id);
-CREATE INDEX idx_remote_recording_status ON remote_recording_requests(status);
-CREATE INDEX idx_remote_recording_created_at ON remote_recording_requests(created_at);
+CREATE INDEX idx_remote_recording_status ON remote_recording_requests(status, created_at DESC, id DESC);
+CREATE INDEX idx_remote_recording_created_at ON remote_recording_requests(created_at DESC, id DESC);
+
+ALTER TABLE remote_recording_requests ADD CONSTRAINT excl_remote_recording_slot
+    EXCLUDE USING gist (slot WITH &&)
+    WHERE (slot IS NOT NULL AND status IN ('pending', 'approved'));
+
+CREATE UNIQUE INDEX uq_remote_recording_text_slot
+    ON remote_recording_requests (preferred_date, lower(btrim(preferred_time)))
+    WHERE slot IS NULL AND status IN ('pending', 'approved');
 
 
 
@@ -195,6 +379,74 @@ CREATE TABLE notification_reads (
     UNIQUE(notification_id, user_id)
 );
 
+-- Whether a broadcast target type reaches a user with this role; admins never receive notifications
+CREATE FUNCTION broadcast_reaches(target_type TEXT, role TEXT) RETURNS BOOLEAN
+LANGUAGE SQL IMMUTABLE AS $$
+    SELECT role IS DISTINCT FROM 'admin' AND (
+        target_type = 'all'
+        OR (target_type = 'writers' AND role = 'writer')
+        OR (target_type = 'vocalists' AND role = 'vocalist')
+    )
+$$;
+
+-- Per-user inbox, fanned out when a notification is created.
+-- Inbox reads are one range scan on (user_id, created_at).
+CREATE TABLE notification_inbox (
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    notification_id INT NOT NULL REFERENCES notifications(id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL,
+    is_read BOOLEAN NOT NULL DEFAULT FALSE,
+    read_at TIMESTAMP,
+    PRIMARY KEY (user_id, notification_id)
+);
+
+CREATE INDEX idx_notification_inbox_user_created ON notification_inbox(user_id, created_at DESC, notification_id DESC);
+
+CREATE INDEX idx_notification_inbox_unread ON notification_inbox(user_id, notification_id) WHERE NOT is_read;
+
+-- Unread badge counter, updated in the same transaction as inbox writes
+CREATE TABLE notification_unread_counts (
+    user_id INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    unread_count INT NOT NULL DEFAULT 0 CHECK (unread_count >= 0)
+);
+
+-- Broadcast notifications reach users who sign up or change role later,
+-- as the read-time inbox query used to; unread counts are recomputed
+CREATE FUNCTION sync_broadcast_inbox() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM notification_inbox i
+        USING notifications n
+        WHERE i.user_id = NEW.id
+          AND n.id = i.notification_id
+          AND n.target_type IN ('all', 'writers', 'vocalists')
+          AND NOT broadcast_reaches(n.target_type, NEW.role);
+    END IF;
+
+    INSERT INTO notification_inbox (user_id, notification_id, created_at)
+    SELECT NEW.id, n.id, n.created_at
+    FROM notifications n
+    WHERE n.target_type IN ('all', 'writers', 'vocalists')
+      AND broadcast_reaches(n.target_type, NEW.role)
+    ON CONFLICT DO NOTHING;
+
+    INSERT INTO notification_unread_counts (user_id, unread_count)
+    SELECT NEW.id, COUNT(*) FROM notification_inbox WHERE user_id = NEW.id AND NOT is_read
+    ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_users_broadcast_inbox_insert
+AFTER INSERT ON users
+FOR EACH ROW EXECUTE FUNCTION sync_broadcast_inbox();
+
+CREATE TRIGGER trg_users_broadcast_inbox_role
+AFTER UPDATE OF role ON users
+FOR EACH ROW WHEN (OLD.role IS DISTINCT FROM NEW.role)
+EXECUTE FUNCTION sync_broadcast_inbox();
+
 
 
 
@@ -242,7 +494,30 @@ CREATE TABLE guest_posts (
     thumbnail TEXT,
     views TEXT,
     duration TEXT
-)
+);
+
+
+CREATE TABLE IF NOT EXISTS youtube_videos (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    writer TEXT,
+    vocalist TEXT,
+    thumbnail TEXT,
+    views TEXT,
+    duration TEXT,
+    uploaded_at TIMESTAMP,
+    tags TEXT[] DEFAULT '{}'
+);
+
+CREATE INDEX idx_youtube_videos_uploaded_at ON youtube_videos(uploaded_at DESC);
+
+-- Video ID parsed from kalams.youtube_link; no FK to youtube_videos since
+-- that table is truncated on every channel sync.
+CREATE TABLE kalam_youtube_videos (
+    video_id TEXT PRIMARY KEY,
+    kalam_id INT UNIQUE NOT NULL REFERENCES kalams(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 
 
 
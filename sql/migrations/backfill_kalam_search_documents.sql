@@ -0,0 +1,17 @@
+-- One-off backfill for databases created before kalam_search_documents existed.
+-- Fresh installs from schema.sql don't need it; safe to re-run. Normalized
+-- text and transliteration keys are filled in by POST /admin/kalams/search-keys/sync.
+--
+--     psql "$DATABASE_URL" -f sql/migrations/backfill_kalam_search_documents.sql
+
+BEGIN;
+
+INSERT INTO kalam_search_documents (kalam_id, config, language, posted, search_vector)
+SELECT k.id, kalam_search_config(k.language), lower(btrim(k.language)),
+       EXISTS (SELECT 1 FROM kalam_submissions ks WHERE ks.kalam_id = k.id AND ks.status = 'posted'),
+       kalam_search_vector(kalam_search_config(k.language), k.title, k.theme, k.sufi_influence,
+                           k.description, k.kalam_text)
+FROM kalams k
+ON CONFLICT (kalam_id) DO NOTHING;
+
+COMMIT;
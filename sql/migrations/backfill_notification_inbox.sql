@@ -0,0 +1,24 @@
+-- One-off backfill for databases created before notification_inbox existed.
+-- Fresh installs from schema.sql don't need it; safe to re-run.
+--
+--     psql "$DATABASE_URL" -f sql/migrations/backfill_notification_inbox.sql
+
+BEGIN;
+
+INSERT INTO notification_inbox (user_id, notification_id, created_at, is_read, read_at)
+SELECT u.id, n.id, n.created_at, nr.id IS NOT NULL, nr.read_at
+FROM notifications n
+JOIN users u ON (
+    broadcast_reaches(n.target_type, u.role)
+    OR (n.target_type = 'specific' AND u.id = ANY(n.target_user_ids) AND u.role IS DISTINCT FROM 'admin')
+)
+LEFT JOIN notification_reads nr ON nr.notification_id = n.id AND nr.user_id = u.id
+ON CONFLICT DO NOTHING;
+
+INSERT INTO notification_unread_counts (user_id, unread_count)
+SELECT user_id, COUNT(*) FILTER (WHERE NOT is_read)
+FROM notification_inbox
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
+
+COMMIT;
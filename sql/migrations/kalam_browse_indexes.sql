@@ -0,0 +1,27 @@
+-- Brings databases created before the admin kalam browser up to schema.sql:
+-- kalams.created_at becomes NOT NULL (the browser's keyset pagination sorts
+-- on it, and on COALESCE(updated_at, created_at)) and the browse indexes are
+-- created. Fresh installs from schema.sql don't need it; safe to re-run.
+-- The index builds lock kalams against writes while they run.
+--
+--     psql "$DATABASE_URL" -f sql/migrations/kalam_browse_indexes.sql
+
+BEGIN;
+
+UPDATE kalams
+SET created_at = COALESCE(updated_at, published_at, CURRENT_TIMESTAMP)
+WHERE created_at IS NULL;
+
+ALTER TABLE kalams ALTER COLUMN created_at SET NOT NULL;
+
+-- Was (updated_at) before the browser's tiebreak on id
+DROP INDEX IF EXISTS idx_kalams_updated_at;
+CREATE INDEX idx_kalams_updated_at ON kalams(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_kalams_recently_updated ON kalams(COALESCE(updated_at, created_at) DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_kalams_created ON kalams(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_kalams_title ON kalams(title, id);
+CREATE INDEX IF NOT EXISTS idx_kalams_language_created ON kalams(lower(language), created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_kalams_theme ON kalams(lower(theme));
+CREATE INDEX IF NOT EXISTS idx_kalam_submissions_status ON kalam_submissions(status, kalam_id);
+
+COMMIT;
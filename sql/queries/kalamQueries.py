@@ -1,6 +1,139 @@
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values, Json
 from typing import Optional,List
 from fastapi import HTTPException
+from utils.youtube_links import extract_video_id
+from utils.dashboard_stats import dashboard_stats_cache
+from utils.script_normalization import search_keys
+from utils.minhash import signature, band_hashes, NEAR_DUPLICATE_THRESHOLD
+from utils.text_delta import make_delta, apply_delta, delta_size
+from utils.fieldsets import select_list
+from sql.queries.notificationQueries import create_direct_notifications
+
+SUBMISSION_STATUSES = (
+    "draft", "submitted", "changes_requested", "admin_approved",
+    "admin_rejected", "final_approved", "complete_approved", "posted",
+)
+
+# Admin review target status -> submission statuses it may be reached from
+SUBMISSION_REVIEW_TRANSITIONS = {
+    "changes_requested": ["submitted"],
+    "admin_rejected": ["submitted", "changes_requested"],
+    "final_approved": ["submitted", "changes_requested"],
+    "complete_approved": ["final_approved"],
+}
+
+# ?fields= name -> SQL expression. List endpoints default to the summary
+# projection; kalam_text and description are only read when asked for.
+KALAM_COLUMNS = {
+    name: f"k.{name}" for name in (
+        "id", "title", "language", "theme", "kalam_text", "description", "sufi_influence",
+        "musical_preference", "youtube_link", "writer_id", "vocalist_id", "published_at",
+        "created_at", "updated_at",
+    )
+}
+KALAM_SUMMARY_FIELDS = (
+    "id", "title", "language", "theme", "youtube_link", "writer_id", "vocalist_id",
+    "published_at", "created_at",
+)
+POSTED_KALAM_COLUMNS = {
+    **KALAM_COLUMNS,
+    "writer_name": "u.name",
+    "writer_email": "u.email",
+    "writer_country": "u.country",
+    "writer_city": "u.city",
+    "vocalist_name": "v.name",
+    "vocalist_email": "v.email",
+    "vocalist_country": "v.country",
+    "vocalist_city": "v.city",
+}
+POSTED_KALAM_SUMMARY_FIELDS = KALAM_SUMMARY_FIELDS + ("writer_name", "vocalist_name")
+
+# Admin browser sort name -> (column, direction); ties break on k.id the same way
+ADMIN_KALAM_SORTS = {
+    "newest": ("k.created_at", "DESC"),
+    "oldest": ("k.created_at", "ASC"),
+    # updated_at is nullable; a NULL would drop out of the keyset comparison
+    "recently_updated": ("COALESCE(k.updated_at, k.created_at)", "DESC"),
+    "title": ("k.title", "ASC"),
+}
+# Below this many estimated rows the admin browser runs an exact COUNT(*)
+EXACT_COUNT_LIMIT = 10000
+ADMIN_KALAM_SELECT = """
+    k.id, k.title, k.language, k.theme, k.sufi_influence, k.musical_preference,
+    k.writer_id, w.name AS writer_name,
+    k.vocalist_id, v.name AS vocalist_name,
+    k.created_at, k.updated_at,
+    ks.id AS submission_id, ks.status, ks.user_approval_status,
+    ks.vocalist_approval_status, ks.duplicate_of
+"""
+ADMIN_KALAM_FROM = """
+    FROM kalams k
+    LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+    LEFT JOIN users w ON w.id = k.writer_id
+    LEFT JOIN users v ON v.id = k.vocalist_id
+"""
+
+# Every Nth kalam revision is stored in full, bounding replay to N - 1 deltas
+REVISION_SNAPSHOT_INTERVAL = 10
+
+
+def submission_stats_columns(alias: str = "ks") -> str:
+    """Per-status count and average hours from submission to that status, as FILTER aggregates."""
+    columns = []
+    for status in SUBMISSION_STATUSES:
+        columns.append(f"COUNT({alias}.id) FILTER (WHERE {alias}.status = '{status}') AS count_{status}")
+        columns.append(
+            f"AVG(EXTRACT(EPOCH FROM {alias}.updated_at - {alias}.created_at) / 3600) "
+            f"FILTER (WHERE {alias}.status = '{status}') AS hours_{status}"
+        )
+    return ",\n".join(columns)
+
+
+def kalam_browse_conditions(status=None, language=None, theme=None, writer_id=None,
+                            vocalist_id=None, created_from=None, created_to=None) -> tuple:
+    """WHERE conditions and values shared by the admin kalam browser and its export."""
+    conditions = []
+    values = []
+    filters = [
+        ("ks.status = %s", status),
+        ("lower(k.language) = lower(%s)", language),
+        ("lower(k.theme) = lower(%s)", theme),
+        ("k.writer_id = %s", writer_id),
+        ("k.vocalist_id = %s", vocalist_id),
+        ("k.created_at >= %s", created_from),
+        ("k.created_at < %s", created_to),
+    ]
+    for clause, value in filters:
+        if value is not None:
+            conditions.append(clause)
+            values.append(value)
+    return conditions, values
+
+
+def dashboard_owners(cur, kalam_ids=(), submission_ids=()):
+    """(role, user_id) stats-cache keys for the writers and vocalists of the given kalams."""
+    cur.execute("""
+        SELECT writer_id, vocalist_id FROM kalams
+        WHERE id = ANY(%s::int[])
+           OR id IN (SELECT kalam_id FROM kalam_submissions WHERE id = ANY(%s::int[]));
+    """, (list(kalam_ids), list(submission_ids)))
+    owners = []
+    for row in cur.fetchall():
+        owners.append(("writer", row["writer_id"]))
+        owners.append(("vocalist", row["vocalist_id"]))
+    return owners
+
+
+def submission_stats_payload(row: dict) -> dict:
+    return {
+        "by_status": {status: row[f"count_{status}"] for status in SUBMISSION_STATUSES},
+        "avg_hours_to_status": {
+            status: round(float(row[f"hours_{status}"]), 2)
+            for status in SUBMISSION_STATUSES
+            if row[f"hours_{status}"] is not None
+        },
+    }
+
 
 class KalamQueries:
     def __init__(self, conn):
@@ -18,11 +151,244 @@ class KalamQueries:
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query, (title, language, theme, kalam_text, description, sufi_influence, 
                                 musical_preference, writer_id))
+            kalam = cur.fetchone()
+            self.write_search_keys(kalam, cur)
+            self.write_minhash(kalam, cur)
+            self.record_revision(kalam["id"], None, kalam["kalam_text"], cur)
             self.conn.commit()
-            return cur.fetchone()
+            dashboard_stats_cache.invalidate([("writer", writer_id)])
+            return kalam
+
+    def write_search_keys(self, kalam: dict, cur):
+        # The search document row itself is created by trigger in the same transaction
+        normalized_text, transliteration_keys = search_keys([
+            kalam["title"], kalam["theme"], kalam["sufi_influence"],
+            kalam["description"], kalam["kalam_text"],
+        ])
+        cur.execute("""
+            UPDATE kalam_search_documents
+            SET normalized_text = %s, transliteration_keys = %s
+            WHERE kalam_id = %s;
+        """, (normalized_text, transliteration_keys, kalam["id"]))
+
+    def sync_kalam_search_keys(self, batch_size: int = 1000) -> int:
+        """Recompute normalized text and transliteration keys for every kalam."""
+        updated = 0
+        with self.conn.cursor(name="kalam_search_keys", cursor_factory=RealDictCursor) as reader, \
+                self.conn.cursor() as writer:
+            reader.itersize = batch_size
+            reader.execute("""
+                SELECT id, title, theme, sufi_influence, description, kalam_text FROM kalams ORDER BY id;
+            """)
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                values = []
+                for row in rows:
+                    normalized_text, transliteration_keys = search_keys([
+                        row["title"], row["theme"], row["sufi_influence"],
+                        row["description"], row["kalam_text"],
+                    ])
+                    values.append((row["id"], normalized_text, transliteration_keys))
+                execute_values(writer, """
+                    UPDATE kalam_search_documents d
+                    SET normalized_text = v.normalized_text, transliteration_keys = v.transliteration_keys
+                    FROM (VALUES %s) AS v(kalam_id, normalized_text, transliteration_keys)
+                    WHERE d.kalam_id = v.kalam_id;
+                """, values)
+                updated += len(values)
+        self.conn.commit()
+        return updated
+
+    def write_minhash(self, kalam: dict, cur):
+        sig = signature(kalam["kalam_text"])
+        if sig is None:
+            cur.execute("DELETE FROM kalam_minhash WHERE kalam_id = %s;", (kalam["id"],))
+        else:
+            cur.execute("""
+                INSERT INTO kalam_minhash (kalam_id, signature, bands)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (kalam_id) DO UPDATE
+                SET signature = EXCLUDED.signature, bands = EXCLUDED.bands, updated_at = CURRENT_TIMESTAMP;
+            """, (kalam["id"], sig, band_hashes(sig)))
+        self.flag_near_duplicate(kalam["id"], cur)
+
+    def flag_near_duplicate(self, kalam_id: int, cur) -> Optional[dict]:
+        """
+        Point the kalam's submission (if any) at the most similar earlier
+        kalam sharing an LSH bucket, or clear the flag when none clears
+        NEAR_DUPLICATE_THRESHOLD. Returns the new flag columns.
+        """
+        cur.execute("""
+            UPDATE kalam_submissions
+            SET (duplicate_of, duplicate_similarity) = (
+                SELECT m.kalam_id, minhash_similarity(m.signature, t.signature)
+                FROM kalam_minhash t
+                JOIN kalam_minhash m ON m.kalam_id < t.kalam_id
+                WHERE t.kalam_id = %(kalam_id)s
+                  -- A subquery, not t.bands, so the planner probes the GIN index
+                  AND m.bands && (SELECT bands FROM kalam_minhash WHERE kalam_id = %(kalam_id)s)
+                  AND minhash_similarity(m.signature, t.signature) >= %(threshold)s
+                ORDER BY 2 DESC, m.kalam_id
+                LIMIT 1
+            )
+            WHERE kalam_id = %(kalam_id)s
+            RETURNING duplicate_of, duplicate_similarity;
+        """, {"kalam_id": kalam_id, "threshold": NEAR_DUPLICATE_THRESHOLD})
+        return cur.fetchone()
+
+    def scan_near_duplicates(self, batch_size: int = 1000) -> dict:
+        """
+        Recompute every kalam's MinHash signature, then re-flag all
+        submissions from one bucket self-join. Returns the flagged ones.
+        """
+        signed = 0
+        with self.conn.cursor(name="kalam_minhash_scan", cursor_factory=RealDictCursor) as reader, \
+                self.conn.cursor(cursor_factory=RealDictCursor) as writer:
+            reader.itersize = batch_size
+            reader.execute("SELECT id, kalam_text FROM kalams ORDER BY id;")
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                values = []
+                empty = []
+                for row in rows:
+                    sig = signature(row["kalam_text"])
+                    if sig is None:
+                        empty.append(row["id"])
+                    else:
+                        values.append((row["id"], sig, band_hashes(sig)))
+                if values:
+                    execute_values(writer, """
+                        INSERT INTO kalam_minhash (kalam_id, signature, bands)
+                        VALUES %s
+                        ON CONFLICT (kalam_id) DO UPDATE
+                        SET signature = EXCLUDED.signature, bands = EXCLUDED.bands, updated_at = CURRENT_TIMESTAMP;
+                    """, values)
+                if empty:
+                    writer.execute("DELETE FROM kalam_minhash WHERE kalam_id = ANY(%s);", (empty,))
+                signed += len(values)
+
+            writer.execute("""
+                WITH buckets AS (
+                    SELECT kalam_id, unnest(bands) AS bucket FROM kalam_minhash
+                ),
+                pairs AS (
+                    SELECT DISTINCT a.kalam_id, b.kalam_id AS earlier_id
+                    FROM buckets a
+                    JOIN buckets b ON b.bucket = a.bucket AND b.kalam_id < a.kalam_id
+                ),
+                best AS (
+                    SELECT DISTINCT ON (p.kalam_id)
+                        p.kalam_id, p.earlier_id,
+                        minhash_similarity(ma.signature, mb.signature) AS similarity
+                    FROM pairs p
+                    JOIN kalam_minhash ma ON ma.kalam_id = p.kalam_id
+                    JOIN kalam_minhash mb ON mb.kalam_id = p.earlier_id
+                    WHERE minhash_similarity(ma.signature, mb.signature) >= %s
+                    ORDER BY p.kalam_id, similarity DESC, p.earlier_id
+                )
+                UPDATE kalam_submissions ks
+                SET duplicate_of = best.earlier_id, duplicate_similarity = best.similarity
+                FROM kalam_submissions s
+                LEFT JOIN best ON best.kalam_id = s.kalam_id
+                WHERE ks.id = s.id
+                  AND (ks.duplicate_of IS DISTINCT FROM best.earlier_id
+                       OR ks.duplicate_similarity IS DISTINCT FROM best.similarity);
+            """, (NEAR_DUPLICATE_THRESHOLD,))
+            writer.execute("""
+                SELECT
+                    ks.id AS submission_id, ks.kalam_id, k.title, k.writer_id, ks.status,
+                    ks.duplicate_of, d.title AS duplicate_title, d.writer_id AS duplicate_writer_id,
+                    ks.duplicate_similarity
+                FROM kalam_submissions ks
+                JOIN kalams k ON k.id = ks.kalam_id
+                JOIN kalams d ON d.id = ks.duplicate_of
+                ORDER BY ks.duplicate_similarity DESC, ks.id;
+            """)
+            flagged = writer.fetchall()
+        self.conn.commit()
+        return {"signed": signed, "flagged": flagged}
+
+    def record_revision(self, kalam_id: int, old_text: Optional[str], new_text: str, cur):
+        """
+        Append new_text as the kalam's next revision. old_text is the text
+        being replaced (None on create); it becomes revision 1 if the kalam
+        has no history yet.
+        """
+        cur.execute("""
+            SELECT
+                (SELECT MAX(revision) FROM kalam_revisions WHERE kalam_id = %(kalam_id)s) AS last_revision,
+                (SELECT status FROM kalam_submissions WHERE kalam_id = %(kalam_id)s LIMIT 1) AS submission_status;
+        """, {"kalam_id": kalam_id})
+        row = cur.fetchone()
+        revision = row["last_revision"] or 0
+        insert = """
+            INSERT INTO kalam_revisions (kalam_id, revision, snapshot, delta, submission_status)
+            VALUES (%s, %s, %s, %s, %s);
+        """
+        if revision == 0 and old_text is not None:
+            revision = 1
+            cur.execute(insert, (kalam_id, revision, old_text, None, None))  # status at the time is unknown
+
+        revision += 1
+        delta = None
+        if (revision - 1) % REVISION_SNAPSHOT_INTERVAL != 0:
+            delta = make_delta(old_text, new_text)
+            if delta_size(delta) >= len(new_text or ""):
+                delta = None  # rewritten wholesale; the full text is smaller
+        cur.execute(insert, (
+            kalam_id, revision,
+            new_text if delta is None else None,
+            Json(delta) if delta is not None else None,
+            row["submission_status"],
+        ))
+
+    def get_kalam_revisions(self, kalam_id: int) -> List[dict]:
+        query = """
+            SELECT
+                revision,
+                snapshot IS NOT NULL AS is_snapshot,
+                COALESCE(octet_length(snapshot), octet_length(delta::text)) AS stored_bytes,
+                submission_status,
+                created_at
+            FROM kalam_revisions
+            WHERE kalam_id = %s
+            ORDER BY revision;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (kalam_id,))
+            return cur.fetchall()
+
+    def get_kalam_revision_text(self, kalam_id: int, revision: int) -> Optional[str]:
+        """kalam_text as of the given revision, replayed from the nearest snapshot at or before it."""
+        query = """
+            SELECT revision, snapshot, delta
+            FROM kalam_revisions
+            WHERE kalam_id = %(kalam_id)s
+              AND revision <= %(revision)s
+              AND revision >= (
+                  SELECT MAX(revision) FROM kalam_revisions
+                  WHERE kalam_id = %(kalam_id)s AND revision <= %(revision)s AND snapshot IS NOT NULL
+              )
+            ORDER BY revision;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, {"kalam_id": kalam_id, "revision": revision})
+            rows = cur.fetchall()
+        if not rows or rows[-1]["revision"] != revision:
+            return None
+        text = rows[0]["snapshot"]
+        for row in rows[1:]:
+            text = apply_delta(text, row["delta"])
+        return text
 
-    def get_kalam_by_id(self, kalam_id: int):
-        query = "SELECT * FROM kalams WHERE id = %s;"
+    def get_kalam_by_id(self, kalam_id: int, fields: Optional[List[str]] = None):
+        # Internal callers want the whole row; routes pass validated ?fields=
+        columns = select_list(fields, KALAM_COLUMNS) if fields else "*"
+        query = f"SELECT {columns} FROM kalams k WHERE k.id = %s;"
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query, (kalam_id,))
             return cur.fetchone()
@@ -34,6 +400,99 @@ class KalamQueries:
             cur.execute(query, (writer_id,))
             return cur.fetchall()
 
+    def get_writer_kalam_summaries(self, writer_id: int, after_created_at=None, after_id=None,
+                                   limit: int = 20) -> List[dict]:
+        # Summary columns only; kalam_text is served by the detail endpoint
+        conditions = ["k.writer_id = %s"]
+        values = [writer_id]
+        if after_created_at is not None and after_id is not None:
+            conditions.append("(k.created_at, k.id) < (%s, %s)")
+            values.extend([after_created_at, after_id])
+        values.append(limit)
+
+        query = f"""
+            SELECT
+                k.id, k.title, k.language, k.created_at,
+                GREATEST(k.updated_at, ks.updated_at) AS updated_at,
+                ks.id AS submission_id,
+                ks.status,
+                ks.user_approval_status,
+                ks.vocalist_approval_status
+            FROM kalams k
+            LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY k.created_at DESC, k.id DESC
+            LIMIT %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, values)
+            return cur.fetchall()
+
+    def browse_kalams(self, status: Optional[str] = None, language: Optional[str] = None,
+                      theme: Optional[str] = None, writer_id: Optional[int] = None,
+                      vocalist_id: Optional[int] = None, created_from=None, created_to=None,
+                      sort: str = "newest", after_value=None, after_id: Optional[int] = None,
+                      limit: int = 50) -> dict:
+        """
+        One page of the admin kalam browser joined with submission status and
+        writer/vocalist names, plus a total that is exact for small results
+        and the planner's row estimate for large ones.
+        """
+        conditions, values = kalam_browse_conditions(
+            status, language, theme, writer_id, vocalist_id, created_from, created_to
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total, estimated = self.count_rows(f"SELECT 1 {ADMIN_KALAM_FROM} {where}", values)
+
+        column, direction = ADMIN_KALAM_SORTS[sort]
+        page_conditions = list(conditions)
+        page_values = list(values)
+        if after_value is not None and after_id is not None:
+            page_conditions.append(f"({column}, k.id) {'<' if direction == 'DESC' else '>'} (%s, %s)")
+            page_values.extend([after_value, after_id])
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        page_values.append(limit)
+
+        query = f"""
+            SELECT {ADMIN_KALAM_SELECT}, {column} AS sort_value
+            {ADMIN_KALAM_FROM}
+            {page_where}
+            ORDER BY {column} {direction}, k.id {direction}
+            LIMIT %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, page_values)
+            kalams = cur.fetchall()
+        return {"kalams": kalams, "total": total, "total_is_estimate": estimated}
+
+    def kalam_export_query(self, status: Optional[str] = None, language: Optional[str] = None,
+                           theme: Optional[str] = None, writer_id: Optional[int] = None,
+                           vocalist_id: Optional[int] = None, created_from=None, created_to=None,
+                           sort: str = "newest") -> tuple:
+        """(query, values) for every kalam matching the admin browser's filters, for streaming."""
+        conditions, values = kalam_browse_conditions(
+            status, language, theme, writer_id, vocalist_id, created_from, created_to
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        column, direction = ADMIN_KALAM_SORTS[sort]
+        query = f"""
+            SELECT {ADMIN_KALAM_SELECT}
+            {ADMIN_KALAM_FROM}
+            {where}
+            ORDER BY {column} {direction}, k.id {direction};
+        """
+        return query, values
+
+    def count_rows(self, query: str, values) -> tuple:
+        """(count, is_estimate): the planner's estimate, replaced by COUNT(*) when it is small."""
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"EXPLAIN (FORMAT JSON) {query}", values)
+            estimate = int(cur.fetchone()["QUERY PLAN"][0]["Plan"]["Plan Rows"])
+            if estimate >= EXACT_COUNT_LIMIT:
+                return estimate, True
+            cur.execute(f"SELECT COUNT(*) AS total FROM ({query}) AS matching", values)
+            return cur.fetchone()["total"], False
+
     def update_kalam(self, kalam_id: int, title: Optional[str] = None, language: Optional[str] = None, 
                      theme: Optional[str] = None, kalam_text: Optional[str] = None, 
                      description: Optional[str] = None, sufi_influence: Optional[str] = None, 
@@ -70,9 +529,21 @@ class KalamQueries:
         """
 
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            old_text = None
+            if kalam_text is not None:
+                # Row lock also serializes revision numbering for this kalam
+                cur.execute("SELECT kalam_text FROM kalams WHERE id = %s FOR UPDATE;", (kalam_id,))
+                row = cur.fetchone()
+                old_text = row["kalam_text"] if row else None
             cur.execute(query, values)
+            kalam = cur.fetchone()
+            if kalam:
+                self.write_search_keys(kalam, cur)
+                if kalam_text is not None and kalam_text != old_text:
+                    self.write_minhash(kalam, cur)
+                    self.record_revision(kalam_id, old_text, kalam_text, cur)
             self.conn.commit()
-            return cur.fetchone()
+            return kalam
 
     def assign_vocalist(self, kalam_id: int, user_id: int):
         query_update = """
@@ -87,12 +558,10 @@ class KalamQueries:
         WHERE kalam_id = %s
         RETURNING *;
         """
+        # The route has already checked that the vocalist exists
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Check if this user_id exists in vocalists table
-            cur.execute("SELECT 1 FROM vocalists WHERE user_id = %s", (user_id,))
-            if not cur.fetchone():
-                raise ValueError("No vocalist found for this user_id")
-            
+            owners = dashboard_owners(cur, kalam_ids=[kalam_id]) + [("vocalist", user_id)]
+
             # Assign user_id to kalams.vocalist_id
             cur.execute(query_update, (user_id, kalam_id))
             kalam = cur.fetchone()
@@ -102,8 +571,106 @@ class KalamQueries:
             submission = cur.fetchone()
             
             self.conn.commit()
+            dashboard_stats_cache.invalidate(owners)
             return kalam, submission
 
+    def bulk_assign_vocalists(self, assignments: list) -> list:
+        """
+        Assign vocalists to many final_approved kalams in one transaction.
+        `assignments` is a list of (kalam_id, vocalist_user_id) pairs with
+        distinct kalam ids. Vocalists and submission states are each checked
+        with one query, the kalam and submission updates are set-based, and
+        each vocalist gets a single notification for all their new kalams.
+        Returns one result per pair.
+        """
+        kalam_ids = [kalam_id for kalam_id, _ in assignments]
+        vocalist_ids = list({vocalist_id for _, vocalist_id in assignments})
+        assign_query = """
+            WITH input AS (
+                SELECT * FROM unnest(%s::int[], %s::int[]) AS t(kalam_id, vocalist_id)
+            ), assigned AS (
+                UPDATE kalams k
+                SET vocalist_id = i.vocalist_id, updated_at = CURRENT_TIMESTAMP
+                FROM input i, kalam_submissions ks
+                WHERE k.id = i.kalam_id AND ks.kalam_id = k.id AND ks.status = 'final_approved'
+                RETURNING k.id, k.title, k.vocalist_id
+            ), submissions AS (
+                UPDATE kalam_submissions ks
+                SET vocalist_approval_status = 'pending', status = 'final_approved', updated_at = CURRENT_TIMESTAMP
+                FROM assigned a
+                WHERE ks.kalam_id = a.id
+            )
+            SELECT id, title, vocalist_id FROM assigned;
+        """
+        try:
+            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT v.user_id FROM vocalists v
+                    JOIN users u ON v.user_id = u.id
+                    WHERE v.user_id = ANY(%s);
+                """, (vocalist_ids,))
+                known_vocalists = {row["user_id"] for row in cur.fetchall()}
+
+                cur.execute("""
+                    SELECT k.id, k.writer_id, k.vocalist_id, ks.status
+                    FROM kalams k
+                    LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+                    WHERE k.id = ANY(%s)
+                    FOR UPDATE OF k;
+                """, (kalam_ids,))
+                states = {row["id"]: row for row in cur.fetchall()}
+
+                results = {}
+                candidates = []
+                for kalam_id, vocalist_id in assignments:
+                    state = states.get(kalam_id)
+                    result = {"kalam_id": kalam_id, "vocalist_id": vocalist_id,
+                              "status": state["status"] if state else None}
+                    if not state:
+                        result["result"] = "kalam_not_found"
+                    elif vocalist_id not in known_vocalists:
+                        result["result"] = "vocalist_not_found"
+                    elif state["status"] != "final_approved":
+                        result["result"] = "invalid_status"
+                    else:
+                        result["result"] = "assigned"
+                        candidates.append((kalam_id, vocalist_id))
+                    results[kalam_id] = result
+
+                assigned = []
+                if candidates:
+                    cur.execute(assign_query, ([k for k, _ in candidates], [v for _, v in candidates]))
+                    assigned = cur.fetchall()
+                assigned_ids = {row["id"] for row in assigned}
+                for kalam_id, _ in candidates:
+                    if kalam_id not in assigned_ids:  # submission moved on since the check
+                        results[kalam_id]["result"] = "invalid_status"
+
+                titles_by_vocalist = {}
+                for row in assigned:
+                    titles_by_vocalist.setdefault(row["vocalist_id"], []).append(row["title"])
+                create_direct_notifications(cur, [
+                    (
+                        "New kalam assigned" if len(titles) == 1 else f"{len(titles)} new kalams assigned",
+                        "You have been assigned: " + ", ".join(f'"{title}"' for title in titles)
+                        + ". Please review and respond.",
+                        vocalist_id,
+                    )
+                    for vocalist_id, titles in titles_by_vocalist.items()
+                ])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        owners = []
+        for row in assigned:
+            state = states[row["id"]]
+            owners += [("writer", state["writer_id"]), ("vocalist", state["vocalist_id"]),
+                       ("vocalist", row["vocalist_id"])]
+        dashboard_stats_cache.invalidate(owners)
+        return [results[kalam_id] for kalam_id in kalam_ids]
+
     def update_youtube_link(self, kalam_id: int, youtube_link: str):
         query_kalam = """
         UPDATE kalams
@@ -120,13 +687,62 @@ class KalamQueries:
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query_kalam, (youtube_link, kalam_id))
             kalam = cur.fetchone()
-            
+
             cur.execute(query_submission, (kalam_id,))
             submission = cur.fetchone()
-            
+
+            self.link_youtube_video(kalam_id, youtube_link, cur=cur)
+            owners = dashboard_owners(cur, kalam_ids=[kalam_id])
+
             self.conn.commit()
+            dashboard_stats_cache.invalidate(owners)
             return kalam, submission
 
+    def link_youtube_video(self, kalam_id: int, youtube_link: str, cur=None):
+        video_id = extract_video_id(youtube_link)
+        statements = [("DELETE FROM kalam_youtube_videos WHERE kalam_id = %s;", (kalam_id,))]
+        if video_id:
+            statements.append(("""
+                INSERT INTO kalam_youtube_videos (video_id, kalam_id)
+                VALUES (%s, %s)
+                ON CONFLICT (video_id) DO UPDATE SET kalam_id = EXCLUDED.kalam_id;
+            """, (video_id, kalam_id)))
+
+        if cur:
+            for query, params in statements:
+                cur.execute(query, params)
+        else:
+            with self.conn.cursor() as cur2:
+                for query, params in statements:
+                    cur2.execute(query, params)
+            self.conn.commit()
+        return video_id
+
+    def sync_youtube_video_links(self, cur=None) -> int:
+        """Rebuild the video-to-kalam mapping from every kalams.youtube_link."""
+        def run(c):
+            c.execute("SELECT id, youtube_link FROM kalams WHERE youtube_link IS NOT NULL AND youtube_link <> '';")
+            links = {}
+            for row in c.fetchall():
+                video_id = extract_video_id(row[1])
+                if video_id:
+                    links[video_id] = row[0]  # last kalam wins on duplicate links
+            c.execute("TRUNCATE TABLE kalam_youtube_videos;")
+            if links:
+                execute_values(
+                    c,
+                    "INSERT INTO kalam_youtube_videos (video_id, kalam_id) VALUES %s ON CONFLICT DO NOTHING;",
+                    list(links.items())
+                )
+            return len(links)
+
+        if cur:
+            return run(cur)
+        with self.conn.cursor() as cur2:
+            count = run(cur2)
+        self.conn.commit()
+        return count
+
     def vocalist_response(self, kalam_id: int, vocalist_approval_status: str, vocalist_comments: Optional[str] = None):
         if vocalist_approval_status not in ["approved", "rejected"]:
             raise ValueError("Invalid vocalist approval status")
@@ -160,6 +776,9 @@ class KalamQueries:
             """
 
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # Looked up first: a rejection clears kalams.vocalist_id
+            owners = dashboard_owners(cur, kalam_ids=[kalam_id])
+
             cur.execute(query_kalam, (kalam_id,))
             kalam = cur.fetchone()
             
@@ -167,6 +786,7 @@ class KalamQueries:
             submission = cur.fetchone()
             
             self.conn.commit()
+            dashboard_stats_cache.invalidate(owners)
             return kalam, submission
 
     def get_kalam_submission_by_kalam_id(self, kalam_id: int):
@@ -193,8 +813,12 @@ class KalamQueries:
             """
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(query, (writer_comments, kalam_id))
+                submission = cur.fetchone()
+                submission.update(self.flag_near_duplicate(kalam_id, cur) or {})
+                owners = dashboard_owners(cur, kalam_ids=[kalam_id])
                 self.conn.commit()
-                return cur.fetchone()
+                dashboard_stats_cache.invalidate(owners)
+                return submission
         else:
             query = """
             INSERT INTO kalam_submissions (kalam_id, status, user_approval_status, writer_comments)
@@ -203,8 +827,12 @@ class KalamQueries:
             """
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(query, (kalam_id, writer_comments))
+                submission = cur.fetchone()
+                submission.update(self.flag_near_duplicate(kalam_id, cur) or {})
+                owners = dashboard_owners(cur, kalam_ids=[kalam_id])
                 self.conn.commit()
-                return cur.fetchone()
+                dashboard_stats_cache.invalidate(owners)
+                return submission
 
     def update_submission_status(self, submission_id: int, new_status: str, admin_comments: Optional[str] = None):
         if new_status == "changes_requested":
@@ -233,9 +861,80 @@ class KalamQueries:
 
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query, params)
+            submission = cur.fetchone()
+            owners = dashboard_owners(cur, submission_ids=[submission_id])
             self.conn.commit()
-            return cur.fetchone()
+            dashboard_stats_cache.invalidate(owners)
+            return submission
+
+
+    def bulk_review_submissions(self, submission_ids: list, new_status: str,
+                                admin_comments: Optional[str] = None) -> list:
+        """
+        Move many submissions to new_status in one UPDATE guarded by the
+        allowed source statuses and commit once. Approval side effects match
+        update_submission_status, which does not check transitions; bulk
+        review only applies SUBMISSION_REVIEW_TRANSITIONS. Returns one result
+        per requested id.
+        """
+        query = """
+            WITH previous AS (
+                SELECT ks.id, ks.status, k.writer_id, k.vocalist_id
+                FROM kalam_submissions ks
+                -- kalam_id is nullable; such submissions are still updated below
+                LEFT JOIN kalams k ON k.id = ks.kalam_id
+                WHERE ks.id = ANY(%(ids)s)
+            ), updated AS (
+                UPDATE kalam_submissions
+                SET status = %(status)s,
+                    admin_comments = %(comments)s,
+                    user_approval_status = CASE %(status)s
+                        WHEN 'changes_requested' THEN 'pending'
+                        WHEN 'final_approved' THEN 'approved'
+                        ELSE user_approval_status
+                    END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%(ids)s) AND status = ANY(%(allowed)s)
+                RETURNING id
+            )
+            SELECT p.id, p.status AS previous_status, u.id IS NOT NULL AS updated,
+                   p.writer_id, p.vocalist_id
+            FROM previous p
+            LEFT JOIN updated u ON u.id = p.id;
+        """
+        params = {
+            "ids": list(submission_ids),
+            "status": new_status,
+            "comments": admin_comments,
+            "allowed": SUBMISSION_REVIEW_TRANSITIONS[new_status],
+        }
+        try:
+            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, params)
+                rows = {row["id"]: row for row in cur.fetchall()}
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        changed = [row for row in rows.values() if row["updated"]]
+        dashboard_stats_cache.invalidate(
+            [("writer", row["writer_id"]) for row in changed]
+            + [("vocalist", row["vocalist_id"]) for row in changed]
+        )
 
+        results = []
+        for submission_id in dict.fromkeys(submission_ids):
+            row = rows.get(submission_id)
+            if not row:
+                results.append({"id": submission_id, "result": "not_found", "previous_status": None, "status": None})
+            elif row["updated"]:
+                results.append({"id": submission_id, "result": "updated",
+                                "previous_status": row["previous_status"], "status": new_status})
+            else:
+                results.append({"id": submission_id, "result": "invalid_transition",
+                                "previous_status": row["previous_status"], "status": row["previous_status"]})
+        return results
 
     def writer_response(self, submission_id: int, user_approval_status: str, writer_comments: Optional[str] = None):
     # Only update status if user_approval_status is 'rejected'
@@ -260,22 +959,194 @@ class KalamQueries:
 
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query, params)
+            submission = cur.fetchone()
+            owners = dashboard_owners(cur, submission_ids=[submission_id])
             self.conn.commit()
-            return cur.fetchone()
+            dashboard_stats_cache.invalidate(owners)
+            return submission
 
 
-    def fetch_posted_kalams(self, skip: int, limit: int) -> List[dict]:
-        query = """
+    def search_posted_kalams(self, q: str, language: Optional[str] = None,
+                             skip: int = 0, limit: int = 10) -> List[dict]:
+        """
+        Ranked full-text search over posted kalams. Each document is matched
+        with the tsquery of its own text search config, so English kalams get
+        stemming while Urdu/Punjabi ones match word for word. Snippets are
+        only built for the returned page.
+        """
+        language_filter = "AND d.language = lower(btrim(%(language)s))" if language else ""
+        query = f"""
+            WITH q AS (
+                SELECT websearch_to_tsquery('simple', %(q)s) AS simple_q,
+                       websearch_to_tsquery('english', %(q)s) AS english_q
+            ), ranked AS (
+                SELECT d.kalam_id, d.config, t.tsq, ts_rank(d.search_vector, t.tsq, 1) AS rank
+                FROM q
+                JOIN kalam_search_documents d
+                  ON d.posted AND (d.search_vector @@ q.simple_q OR d.search_vector @@ q.english_q)
+                CROSS JOIN LATERAL (
+                    SELECT CASE WHEN d.config = 'english'::regconfig THEN q.english_q ELSE q.simple_q END AS tsq
+                ) t
+                WHERE d.search_vector @@ t.tsq
+                  {language_filter}
+                ORDER BY rank DESC, d.kalam_id DESC
+                OFFSET %(skip)s
+                LIMIT %(limit)s
+            )
+            SELECT
+                k.id, k.title, k.language, k.theme, k.youtube_link, k.published_at,
+                u.name AS writer_name,
+                v.name AS vocalist_name,
+                r.rank,
+                ts_headline(r.config, k.title, r.tsq,
+                            'HighlightAll=true, StartSel=<mark>, StopSel=</mark>') AS title_highlight,
+                ts_headline(r.config, coalesce(k.kalam_text, ''), r.tsq,
+                            'MaxFragments=2, MaxWords=18, MinWords=6, StartSel=<mark>, StopSel=</mark>') AS snippet,
+                'fulltext' AS match
+            FROM ranked r
+            JOIN kalams k ON k.id = r.kalam_id
+            LEFT JOIN users u ON k.writer_id = u.id
+            LEFT JOIN users v ON k.vocalist_id = v.id
+            ORDER BY r.rank DESC, r.kalam_id DESC;
+        """
+        params = {"q": q, "language": language, "skip": skip, "limit": limit}
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def lookup_posted_kalams(self, q: str, language: Optional[str] = None,
+                             skip: int = 0, limit: int = 10) -> List[dict]:
+        """
+        Fuzzy, cross-script lookup over posted kalams: the query goes through
+        the same normalization as the stored documents and is matched with
+        pg_trgm word similarity on the transliteration keys and folded text.
+        """
+        normalized_text, transliteration_keys = search_keys([q])
+        if not normalized_text:
+            return []
+
+        language_filter = "AND d.language = lower(btrim(%(language)s))" if language else ""
+        query = f"""
+            WITH ranked AS (
+                SELECT d.kalam_id,
+                       GREATEST(word_similarity(%(keys)s, d.transliteration_keys),
+                                word_similarity(%(normalized)s, d.normalized_text)) AS rank
+                FROM kalam_search_documents d
+                WHERE d.posted
+                  AND (%(keys)s <%% d.transliteration_keys OR %(normalized)s <%% d.normalized_text)
+                  {language_filter}
+                ORDER BY rank DESC, d.kalam_id DESC
+                OFFSET %(skip)s
+                LIMIT %(limit)s
+            )
             SELECT
-                k.*,
+                k.id, k.title, k.language, k.theme, k.youtube_link, k.published_at,
                 u.name AS writer_name,
-                u.email AS writer_email,
-                u.country AS writer_country,
-                u.city AS writer_city,
                 v.name AS vocalist_name,
-                v.email AS vocalist_email,
-                v.country AS vocalist_country,
-                v.city AS vocalist_city
+                r.rank,
+                k.title AS title_highlight,
+                NULL AS snippet,
+                'fuzzy' AS match
+            FROM ranked r
+            JOIN kalams k ON k.id = r.kalam_id
+            LEFT JOIN users u ON k.writer_id = u.id
+            LEFT JOIN users v ON k.vocalist_id = v.id
+            ORDER BY r.rank DESC, r.kalam_id DESC;
+        """
+        params = {
+            "keys": transliteration_keys,
+            "normalized": normalized_text,
+            "language": language,
+            "skip": skip,
+            "limit": limit,
+        }
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def get_suggestion_sources(self, since=None) -> dict:
+        """
+        Rows for the /public/suggest index: kalam titles with their posted
+        flag and YouTube views, and writer/vocalist names with their posted
+        kalam counts. With `since`, only kalams and people touched after that
+        timestamp are returned, including ones that are no longer eligible
+        so the index can drop them; without it, only eligible rows.
+        """
+        if since is None:
+            changed = ""
+            kalam_filter = "WHERE EXISTS (SELECT 1 FROM kalam_submissions ks WHERE ks.kalam_id = k.id AND ks.status = 'posted')"
+            people_filter = ""
+        else:
+            changed = """
+                WITH changed_kalams AS (
+                    SELECT id FROM kalams WHERE updated_at > %(since)s
+                    UNION
+                    SELECT kalam_id FROM kalam_submissions WHERE updated_at > %(since)s
+                ),
+                changed_people AS (
+                    SELECT id FROM users WHERE updated_at > %(since)s
+                    UNION
+                    SELECT user_id FROM vocalists WHERE updated_at > %(since)s
+                    UNION
+                    SELECT writer_id FROM kalams WHERE id IN (SELECT id FROM changed_kalams)
+                    UNION
+                    SELECT vocalist_id FROM kalams WHERE id IN (SELECT id FROM changed_kalams)
+                )
+            """
+            kalam_filter = "WHERE k.id IN (SELECT id FROM changed_kalams)"
+            people_filter = "AND u.id IN (SELECT id FROM changed_people)"
+
+        kalams_query = f"""
+            {changed}
+            SELECT
+                k.id, k.title,
+                EXISTS (
+                    SELECT 1 FROM kalam_submissions ks WHERE ks.kalam_id = k.id AND ks.status = 'posted'
+                ) AS posted,
+                yv.views
+            FROM kalams k
+            LEFT JOIN kalam_youtube_videos kyv ON kyv.kalam_id = k.id
+            LEFT JOIN youtube_videos yv ON yv.id = kyv.video_id
+            {kalam_filter};
+        """
+        people_query = f"""
+            {changed}
+            SELECT
+                u.id, u.name, u.role,
+                v.status AS vocalist_status,
+                CASE u.role
+                    WHEN 'writer' THEN (
+                        SELECT COUNT(*) FROM kalams k
+                        JOIN kalam_submissions ks ON ks.kalam_id = k.id AND ks.status = 'posted'
+                        WHERE k.writer_id = u.id
+                    )
+                    ELSE (
+                        SELECT COUNT(*) FROM kalams k
+                        JOIN kalam_submissions ks ON ks.kalam_id = k.id AND ks.status = 'posted'
+                        WHERE k.vocalist_id = u.id
+                    )
+                END AS posted_kalams
+            FROM users u
+            LEFT JOIN vocalists v ON v.user_id = u.id
+            WHERE u.role IN ('writer', 'vocalist')
+              {people_filter};
+        """
+        params = {"since": since}
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # Taken first, so rows committed while these run are picked up next time
+            cur.execute("SELECT LOCALTIMESTAMP AS watermark;")
+            watermark = cur.fetchone()["watermark"]
+            cur.execute(kalams_query, params)
+            kalams = cur.fetchall()
+            cur.execute(people_query, params)
+            people = cur.fetchall()
+        return {"kalams": kalams, "people": people, "watermark": watermark}
+
+    def fetch_posted_kalams(self, skip: int, limit: int,
+                            fields: Optional[List[str]] = None) -> List[dict]:
+        columns = select_list(fields or POSTED_KALAM_SUMMARY_FIELDS, POSTED_KALAM_COLUMNS)
+        query = f"""
+            SELECT {columns}
             FROM kalams k
             JOIN users u ON k.writer_id = u.id
             LEFT JOIN users v ON k.vocalist_id = v.id
@@ -323,9 +1194,20 @@ class KalamQueries:
 
     def get_all_youtube_videos(self):
         query = """
-            SELECT id, title, writer, vocalist, thumbnail, views, duration, uploaded_at, tags
-            FROM youtube_videos
-            ORDER BY uploaded_at DESC
+            SELECT
+                yv.id, yv.title,
+                COALESCE(w.name, yv.writer) AS writer,
+                COALESCE(v.name, yv.vocalist) AS vocalist,
+                yv.thumbnail, yv.views, yv.duration, yv.uploaded_at, yv.tags,
+                k.id AS kalam_id,
+                k.writer_id,
+                k.vocalist_id
+            FROM youtube_videos yv
+            LEFT JOIN kalam_youtube_videos kyv ON kyv.video_id = yv.id
+            LEFT JOIN kalams k ON k.id = kyv.kalam_id
+            LEFT JOIN users w ON w.id = k.writer_id
+            LEFT JOIN users v ON v.id = k.vocalist_id
+            ORDER BY yv.uploaded_at DESC
         """
         try:
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -338,9 +1220,20 @@ class KalamQueries:
 
     def get_three_youtube_videos(self):
         query = """
-            SELECT id, title, writer, vocalist, thumbnail, views, duration, uploaded_at, tags
-            FROM youtube_videos
-            ORDER BY uploaded_at DESC
+            SELECT
+                yv.id, yv.title,
+                COALESCE(w.name, yv.writer) AS writer,
+                COALESCE(v.name, yv.vocalist) AS vocalist,
+                yv.thumbnail, yv.views, yv.duration, yv.uploaded_at, yv.tags,
+                k.id AS kalam_id,
+                k.writer_id,
+                k.vocalist_id
+            FROM youtube_videos yv
+            LEFT JOIN kalam_youtube_videos kyv ON kyv.video_id = yv.id
+            LEFT JOIN kalams k ON k.id = kyv.kalam_id
+            LEFT JOIN users w ON w.id = k.writer_id
+            LEFT JOIN users v ON v.id = k.vocalist_id
+            ORDER BY yv.uploaded_at DESC
             LIMIT 3
         """
         try:
@@ -1,12 +1,85 @@
 from typing import List
-from psycopg2.extras import RealDictCursor
+import json
+from psycopg2.extras import RealDictCursor, DictCursor
 from pydantic import BaseModel
+
+NOTIFICATION_CHANNEL = "notifications"
+NOTIFY_PAYLOAD_LIMIT = 7900  # Postgres rejects NOTIFY payloads of 8000 bytes or more
+ALL_GUEST_POSTS_QUERY = """
+    SELECT 
+        gp.*,
+        u.name AS author
+    FROM guest_posts gp
+    JOIN users u ON gp.user_id = u.id
+    ORDER BY gp.date DESC;
+"""
+
 class SpecialRecognitionCreate(BaseModel):
     title: str
     subtitle: str | None = None
     description: str | None = None
     achievement: str | None = None
 
+def publish_notification(cur, notification):
+    # Delivered to LISTENers only when the surrounding transaction commits
+    payload = {
+        "id": notification["id"],
+        "title": notification["title"],
+        "message": notification["message"],
+        "target_type": notification["target_type"],
+        "target_user_ids": notification["target_user_ids"] or [],
+        "created_at": notification["created_at"].isoformat() if notification["created_at"] else None,
+    }
+    data = json.dumps(payload)
+    if len(data.encode("utf-8")) > NOTIFY_PAYLOAD_LIMIT:
+        # Clients fetch the full message from the inbox
+        payload["message"] = None
+        payload["truncated"] = True
+        data = json.dumps(payload)
+        if len(data.encode("utf-8")) > NOTIFY_PAYLOAD_LIMIT:
+            return False
+    cur.execute("SELECT pg_notify(%s, %s);", (NOTIFICATION_CHANNEL, data))
+    return True
+
+
+def create_direct_notifications(cur, items):
+    """
+    Insert one 'specific' notification per (title, message, user_id) item,
+    with inbox rows and unread counters, as a single statement. Runs in
+    the caller's open transaction; the caller commits.
+    """
+    if not items:
+        return []
+    titles, messages, user_ids = (list(col) for col in zip(*items))
+    query = """
+    WITH created AS (
+        INSERT INTO notifications (title, message, target_type, target_user_ids)
+        SELECT t.title, t.message, 'specific', ARRAY[t.user_id]
+        FROM unnest(%s::text[], %s::text[], %s::int[]) AS t(title, message, user_id)
+        RETURNING id, title, message, target_type, target_user_ids, created_at
+    ), delivered AS (
+        INSERT INTO notification_inbox (user_id, notification_id, created_at)
+        SELECT u.id, c.id, c.created_at
+        FROM created c
+        JOIN users u ON u.id = c.target_user_ids[1]
+        WHERE u.role IS DISTINCT FROM 'admin'
+        ON CONFLICT DO NOTHING
+        RETURNING user_id
+    ), counted AS (
+        INSERT INTO notification_unread_counts (user_id, unread_count)
+        SELECT user_id, COUNT(*) FROM delivered GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_unread_counts.unread_count + EXCLUDED.unread_count
+    )
+    SELECT id, title, message, target_type, target_user_ids, created_at FROM created;
+    """
+    cur.execute(query, (titles, messages, user_ids))
+    notifications = cur.fetchall()
+    for notification in notifications:
+        publish_notification(cur, notification)
+    return notifications
+
+
 class NotificationQueries:
     def __init__(self, conn):
         self.conn = conn
@@ -17,48 +90,123 @@ class NotificationQueries:
         VALUES (%s, %s, %s, %s)
         RETURNING id, title, message, target_type, target_user_ids, created_at;
         """
-        with self.conn.cursor() as cur:
+        with self.conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute(query, (title, message, target_type, target_user_ids))
             notification = cur.fetchone()
+            self.fan_out_notification(notification[0], notification[5], target_type, target_user_ids, cur=cur)
+            publish_notification(cur, notification)
             self.conn.commit()
         return notification
 
-    def get_user_notifications(self, user_id):
-        user = self.get_user_by_id(user_id)
-        if not user or user["role"] == "admin":
-            return []
+    def fan_out_notification(self, notification_id, created_at, target_type, target_user_ids=None, cur=None):
+        # Admins never receive notifications, matching the old inbox query
+        if target_type == "writers":
+            condition, params = "u.role = 'writer'", ()
+        elif target_type == "vocalists":
+            condition, params = "u.role = 'vocalist'", ()
+        elif target_type == "specific":
+            condition, params = "u.id = ANY(%s) AND u.role IS DISTINCT FROM 'admin'", (list(target_user_ids or []),)
+        else:
+            condition, params = "u.role IS DISTINCT FROM 'admin'", ()
 
-        user_role = user["role"]+'s'  # Convert 'writer' to 'writers', 'vocalist' to 'vocalists'
+        query = f"""
+        WITH delivered AS (
+            INSERT INTO notification_inbox (user_id, notification_id, created_at)
+            SELECT u.id, %s, %s
+            FROM users u
+            WHERE {condition}
+            ON CONFLICT DO NOTHING
+            RETURNING user_id
+        )
+        INSERT INTO notification_unread_counts (user_id, unread_count)
+        SELECT user_id, 1 FROM delivered
+        ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = notification_unread_counts.unread_count + 1;
+        """
+        if cur:
+            cur.execute(query, (notification_id, created_at, *params))
+            return cur.rowcount
+        with self.conn.cursor() as cur2:
+            cur2.execute(query, (notification_id, created_at, *params))
+            self.conn.commit()
+            return cur2.rowcount
 
-        query = """
-        SELECT n.id, n.title, n.message, n.target_type, n.target_user_ids, n.created_at,
-            CASE WHEN nr.id IS NULL THEN FALSE ELSE TRUE END AS is_read
-        FROM notifications n
-        LEFT JOIN notification_reads nr
-            ON nr.notification_id = n.id AND nr.user_id = %s
-        WHERE n.target_type = 'all'
-        OR n.target_type = %s
-        OR (n.target_type = 'specific' AND %s = ANY(n.target_user_ids))
-        ORDER BY n.created_at DESC;
+    def get_user_notifications(self, user_id, limit=50, before_created_at=None, before_id=None):
+        # Keyset pagination: pass the created_at/id of the last row seen
+        if before_created_at is not None and before_id is not None:
+            keyset = "AND (i.created_at, i.notification_id) < (%s, %s)"
+            params = (user_id, before_created_at, before_id, limit)
+        else:
+            keyset = ""
+            params = (user_id, limit)
+
+        query = f"""
+        SELECT n.id, n.title, n.message, n.target_type, n.target_user_ids, i.created_at, i.is_read
+        FROM notification_inbox i
+        JOIN notifications n ON n.id = i.notification_id
+        WHERE i.user_id = %s
+        {keyset}
+        ORDER BY i.created_at DESC, i.notification_id DESC
+        LIMIT %s;
         """
         with self.conn.cursor() as cur:
-            cur.execute(query, (user_id, user_role, user_id))
+            cur.execute(query, params)
             notifications = cur.fetchall()
         return notifications
 
     def mark_as_read(self, notification_id, user_id):
         query = """
-        INSERT INTO notification_reads (notification_id, user_id)
-        VALUES (%s, %s)
-        ON CONFLICT (notification_id, user_id) DO NOTHING
-        RETURNING id;
+        WITH marked AS (
+            UPDATE notification_inbox
+            SET is_read = TRUE, read_at = CURRENT_TIMESTAMP
+            WHERE user_id = %s AND notification_id = %s AND NOT is_read
+            RETURNING notification_id
+        ), counter AS (
+            UPDATE notification_unread_counts
+            SET unread_count = GREATEST(unread_count - 1, 0)
+            WHERE user_id = %s AND EXISTS (SELECT 1 FROM marked)
+        )
+        SELECT notification_id FROM marked;
         """
         with self.conn.cursor() as cur:
-            cur.execute(query, (notification_id, user_id))
+            cur.execute(query, (user_id, notification_id, user_id))
             read_entry = cur.fetchone()
             self.conn.commit()
         return read_entry
 
+    def mark_all_as_read(self, user_id, up_to_id=None):
+        up_to = "AND notification_id <= %s" if up_to_id is not None else ""
+        params = (user_id, up_to_id, user_id) if up_to_id is not None else (user_id, user_id)
+
+        query = f"""
+        WITH marked AS (
+            UPDATE notification_inbox
+            SET is_read = TRUE, read_at = CURRENT_TIMESTAMP
+            WHERE user_id = %s AND NOT is_read {up_to}
+            RETURNING notification_id
+        ), total AS (
+            SELECT COUNT(*) AS marked_count FROM marked
+        ), counter AS (
+            UPDATE notification_unread_counts c
+            SET unread_count = GREATEST(c.unread_count - total.marked_count, 0)
+            FROM total
+            WHERE c.user_id = %s AND total.marked_count > 0
+        )
+        SELECT marked_count FROM total;
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            marked_count = cur.fetchone()[0]
+            self.conn.commit()
+        return marked_count
+
+    def get_unread_count(self, user_id):
+        query = "SELECT unread_count FROM notification_unread_counts WHERE user_id = %s;"
+        with self.conn.cursor() as cur:
+            cur.execute(query, (user_id,))
+            row = cur.fetchone()
+        return row[0] if row else 0
+
 
 
     def create_guest_post(
@@ -113,17 +261,9 @@ class NotificationQueries:
         
     
     def fetch_all_guest_posts(self) -> List[dict]:
-        query = """
-            SELECT 
-                gp.*,
-                u.name AS author
-            FROM guest_posts gp
-            JOIN users u ON gp.user_id = u.id
-            ORDER BY gp.date DESC;
-        """
         try:
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query)
+                cur.execute(ALL_GUEST_POSTS_QUERY)
                 return cur.fetchall()
         except Exception as e:
             raise e
@@ -1,8 +1,36 @@
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, DateTimeTZRange
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException
 from datetime import date
+from sql.queries.notificationQueries import create_direct_notifications
+from utils.slots import (
+    parse_preferred_slot, availability_cache, STUDIO_TIMEZONE_NAME,
+    SLOT_MINUTES, STUDIO_OPEN_HOUR, STUDIO_CLOSE_HOUR
+)
+
+SLOT_TAKEN_DETAIL = "The selected time slot is already taken. Please choose another time."
+REQUEST_TABLES = {
+    "studio": "studio_visit_requests",
+    "remote": "remote_recording_requests",
+}
+# Target status -> statuses it may be reached from
+STATUS_TRANSITIONS = {
+    "approved": ["pending"],
+    "rejected": ["pending", "approved"],
+    "completed": ["approved"],
+}
+REQUEST_LABELS = {
+    "studio": "studio visit request",
+    "remote": "remote recording request",
+}
+# Columns shown in the admin list views; the full row comes from the detail lookup
+REQUEST_SUMMARY_COLUMNS = {
+    "studio": "id, vocalist_id, kalam_id, name, email, preferred_date, preferred_time, "
+              "number_of_visitors, status, created_at",
+    "remote": "id, vocalist_id, kalam_id, name, email, city, country, preferred_date, "
+              "preferred_time, project_type, status, created_at",
+}
 
 class StudioQueries:
     def __init__(self, conn):
@@ -37,33 +65,6 @@ class StudioQueries:
             print(result)
             return result['conflict']
         
-    def check_studio_visit_conflict_datetime(self, preferred_date: date, preferred_time: str) -> bool:
-        query = """
-            SELECT EXISTS (
-                SELECT 1 FROM studio_visit_requests 
-                WHERE preferred_date = %s AND preferred_time = %s
-            ) as conflict;
-        """
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query, (preferred_date, preferred_time))
-            result = cur.fetchone()
-            print(result)
-            return result['conflict']
-
-    def check_remote_recording_conflict_datetime(self, preferred_date: date, preferred_time: str) -> bool:
-        query = """
-            SELECT EXISTS (
-                SELECT 1 FROM remote_recording_requests 
-                WHERE preferred_date = %s AND preferred_time = %s
-            ) as conflict;
-        """
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query, (preferred_date, preferred_time))
-            result = cur.fetchone()
-            print(result)
-            return result['conflict']
-
-
     def create_studio_visit_request(self, data: dict) -> dict:
         if data.get('preferred_date'):
             preferred_date_obj = data['preferred_date']
@@ -74,24 +75,15 @@ class StudioQueries:
                     status_code=400,
                     detail="The preferred date cannot be in the past."
                 )
-        # Check for scheduling conflict
-        if data.get('preferred_date') and data.get('preferred_time'):
-            if self.check_studio_visit_conflict_datetime(
-                data['preferred_date'], 
-                data['preferred_time']
-            ):
-                raise HTTPException(
-                    status_code=400, 
-                    detail="The selected time slot is already taken. Please choose another time."
-                )
-
+        # Overlapping bookings are rejected by the slot constraints, not a pre-check
         query = """
             INSERT INTO studio_visit_requests (
                 vocalist_id, kalam_id, name, email, organization, contact_number,
-                preferred_date, preferred_time, purpose, number_of_visitors,
+                preferred_date, preferred_time, slot, purpose, number_of_visitors,
                 additional_details, special_requests, status, created_at, updated_at
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
             RETURNING *;
         """
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -101,13 +93,76 @@ class StudioQueries:
                 data['name'], data['email'],
                 data['organization'], data['contact_number'],
                 data['preferred_date'], data['preferred_time'],
+                self.slot_range(data.get('preferred_date'), data.get('preferred_time')),
                 data['purpose'], data['number_of_visitors'],
                 data['additional_details'], data['special_requests'],
                 'pending', datetime.now(timezone.utc),
                 datetime.now(timezone.utc)
             ))
+            result = cur.fetchone()
             self.conn.commit()
-            return cur.fetchone()
+            if not result:
+                raise HTTPException(status_code=400, detail=SLOT_TAKEN_DETAIL)
+            if result['preferred_date']:
+                availability_cache.invalidate("studio", result['preferred_date'])
+            return result
+
+    def get_free_slots(self, kind: str, from_date: date, to_date: date) -> dict:
+        """Configured daily slots in [from_date, to_date] that no active booking overlaps."""
+        table = REQUEST_TABLES[kind]
+        query = f"""
+            WITH candidate AS (
+                SELECT d::date AS day,
+                       tstzrange(s, s + make_interval(mins => %(slot)s), '[)') AS slot
+                FROM generate_series(%(from)s::timestamp, %(to)s::timestamp, interval '1 day') AS d,
+                     generate_series(
+                         (d + make_interval(hours => %(open)s)) AT TIME ZONE %(tz)s,
+                         (d + make_interval(hours => %(close)s, mins => -%(slot)s)) AT TIME ZONE %(tz)s,
+                         make_interval(mins => %(slot)s)
+                     ) AS s
+            )
+            SELECT c.day, lower(c.slot) AS start, upper(c.slot) AS "end"
+            FROM candidate c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} r
+                WHERE r.slot && c.slot
+                AND r.slot IS NOT NULL AND r.status IN ('pending', 'approved')
+            )
+            ORDER BY c.slot;
+        """
+        params = {
+            "from": from_date, "to": to_date, "tz": STUDIO_TIMEZONE_NAME,
+            "slot": SLOT_MINUTES, "open": STUDIO_OPEN_HOUR, "close": STUDIO_CLOSE_HOUR,
+        }
+        days = {d: [] for d in self._date_range(from_date, to_date)}
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, params)
+            for row in cur.fetchall():
+                days[row['day']].append({"start": row['start'], "end": row['end']})
+        return days
+
+    def get_availability(self, kind: str, from_date: date, to_date: date) -> dict:
+        all_days = list(self._date_range(from_date, to_date))
+        days = availability_cache.get_days(kind, all_days)
+        missing = [d for d in all_days if d not in days]
+        if missing:
+            # One query covering every uncached day in the window
+            fresh = self.get_free_slots(kind, missing[0], missing[-1])
+            availability_cache.set_days(kind, fresh)
+            days.update(fresh)
+        return {d: days[d] for d in all_days}
+
+    def _date_range(self, from_date: date, to_date: date):
+        current = from_date
+        while current <= to_date:
+            yield current
+            current += timedelta(days=1)
+
+    def slot_range(self, preferred_date, preferred_time) -> Optional[DateTimeTZRange]:
+        slot = parse_preferred_slot(preferred_date, preferred_time)
+        if not slot:
+            return None
+        return DateTimeTZRange(slot[0], slot[1], '[)')
 
     def get_all_studio_visit_requests(self) -> list:
         query = "SELECT * FROM studio_visit_requests ORDER BY created_at DESC;"
@@ -115,6 +170,116 @@ class StudioQueries:
             cur.execute(query)
             return cur.fetchall()
 
+    def get_request_queue(self, kind: str, status: Optional[str] = None,
+                          created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                          vocalist_id: Optional[int] = None, kalam_id: Optional[int] = None,
+                          after_created_at: Optional[datetime] = None, after_id: Optional[int] = None,
+                          limit: int = 50) -> list:
+        conditions = []
+        values = []
+        filters = [
+            ("status = %s", status),
+            ("created_at >= %s", created_from),
+            ("created_at < %s", created_to),
+            ("vocalist_id = %s", vocalist_id),
+            ("kalam_id = %s", kalam_id),
+        ]
+        for clause, value in filters:
+            if value is not None:
+                conditions.append(clause)
+                values.append(value)
+
+        # Keyset pagination over (created_at DESC, id DESC)
+        if after_created_at is not None and after_id is not None:
+            conditions.append("(created_at, id) < (%s, %s)")
+            values.extend([after_created_at, after_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        values.append(limit)
+
+        query = f"""
+            SELECT {REQUEST_SUMMARY_COLUMNS[kind]}
+            FROM {REQUEST_TABLES[kind]}
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, values)
+            return cur.fetchall()
+
+    def bulk_update_request_status(self, kind: str, request_ids: list, new_status: str,
+                                   comments: Optional[str] = None) -> list:
+        """
+        Move many requests to new_status in one UPDATE guarded by the allowed
+        source statuses, notify the affected vocalists, and commit once.
+        Returns one result per requested id.
+        """
+        table = REQUEST_TABLES[kind]
+        query = f"""
+            WITH previous AS (
+                SELECT id, status FROM {table} WHERE id = ANY(%(ids)s)
+            ), updated AS (
+                UPDATE {table}
+                SET status = %(status)s, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%(ids)s) AND status = ANY(%(allowed)s)
+                RETURNING id, vocalist_id, kalam_id, preferred_date
+            )
+            SELECT p.id, p.status AS previous_status, u.id IS NOT NULL AS updated,
+                   u.vocalist_id, u.kalam_id, u.preferred_date
+            FROM previous p
+            LEFT JOIN updated u ON u.id = p.id;
+        """
+        params = {"ids": list(request_ids), "status": new_status, "allowed": STATUS_TRANSITIONS[new_status]}
+        try:
+            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, params)
+                rows = {row['id']: row for row in cur.fetchall()}
+
+                changed = [row for row in rows.values() if row['updated']]
+                label = REQUEST_LABELS[kind]
+                create_direct_notifications(cur, [
+                    (
+                        f"Your {label} was {new_status}",
+                        f"Your {label} #{row['id']} has been {new_status}."
+                        + (f" Comments: {comments}" if comments else ""),
+                        row['vocalist_id'],
+                    )
+                    for row in changed if row['vocalist_id']
+                ])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        for day in {row['preferred_date'] for row in changed if row['preferred_date']}:
+            availability_cache.invalidate(kind, day)
+
+        results = []
+        for request_id in dict.fromkeys(request_ids):
+            row = rows.get(request_id)
+            if not row:
+                results.append({"id": request_id, "result": "not_found", "previous_status": None, "status": None})
+            elif row['updated']:
+                results.append({"id": request_id, "result": "updated",
+                                "previous_status": row['previous_status'], "status": new_status})
+            else:
+                results.append({"id": request_id, "result": "invalid_transition",
+                                "previous_status": row['previous_status'], "status": row['previous_status']})
+        return results
+
+    def get_studio_visit_request_by_id(self, request_id: int) -> dict:
+        query = "SELECT * FROM studio_visit_requests WHERE id = %s;"
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (request_id,))
+            return cur.fetchone()
+
+    def get_remote_recording_request_by_id(self, request_id: int) -> dict:
+        query = "SELECT * FROM remote_recording_requests WHERE id = %s;"
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (request_id,))
+            return cur.fetchone()
+
     def get_studio_visit_requests_by_vocalist(self, vocalist_user_id: int) -> list:
         query = "SELECT * FROM studio_visit_requests WHERE vocalist_id = %s ORDER BY created_at DESC;"
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -132,25 +297,16 @@ class StudioQueries:
                     status_code=400,
                     detail="The preferred date cannot be in the past."
                 )
-        if data.get('preferred_date') and data.get('preferred_time'):
-            if self.check_remote_recording_conflict_datetime(
-                
-                data['preferred_date'], 
-                data['preferred_time']
-            ):
-                raise HTTPException(
-                    status_code=400, 
-                    detail="The selected time slot is already taken. Please choose another time."
-                )
-
         query = """
             INSERT INTO remote_recording_requests (
-                vocalist_id, kalam_id, name, email, city, country, time_zone, role,
+                vocalist_id, kalam_id, name, email, city, country, time_zone,
+                preferred_date, preferred_time, slot, role,
                 project_type, recording_equipment, internet_speed, preferred_software,
                 availability, recording_experience, technical_setup, additional_details,
                 status, created_at, updated_at
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING
             RETURNING *;
         """
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -158,15 +314,23 @@ class StudioQueries:
                 data['vocalist_id'],
                 data['kalam_id'],
                 data['name'], data['email'],
-                data['city'], data['country'], data['time_zone'], data['role'],
+                data['city'], data['country'], data['time_zone'],
+                data.get('preferred_date'), data.get('preferred_time'),
+                self.slot_range(data.get('preferred_date'), data.get('preferred_time')),
+                data['role'],
                 data['project_type'], data['recording_equipment'], data['internet_speed'],
                 data['preferred_software'], data['availability'],
                 data['recording_experience'], data['technical_setup'],
                 data['additional_details'], 'pending',
                 datetime.now(timezone.utc), datetime.now(timezone.utc)
             ))
+            result = cur.fetchone()
             self.conn.commit()
-            return cur.fetchone()
+            if not result:
+                raise HTTPException(status_code=400, detail=SLOT_TAKEN_DETAIL)
+            if result['preferred_date']:
+                availability_cache.invalidate("remote", result['preferred_date'])
+            return result
 
     def get_all_remote_recording_requests(self) -> list:
         query = "SELECT * FROM remote_recording_requests ORDER BY created_at DESC;"
@@ -179,6 +343,41 @@ class StudioQueries:
         with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(query, (vocalist_user_id,))
             return cur.fetchall()
+    def get_booking_states(self, vocalist_id: int, kalam_ids: Optional[list] = None) -> list:
+        """
+        Latest studio/remote booking per kalam for one vocalist, in one query.
+        Without kalam_ids, covers every kalam assigned to the vocalist.
+        """
+        if kalam_ids is None:
+            ids_sql, ids_params = "SELECT id AS kalam_id FROM kalams WHERE vocalist_id = %s", (vocalist_id,)
+        else:
+            ids_sql, ids_params = "SELECT DISTINCT unnest(%s::int[]) AS kalam_id", (list(kalam_ids),)
+
+        query = f"""
+        WITH ids AS ({ids_sql}),
+        bookings AS (
+            SELECT 'studio' AS request_type, s.kalam_id, s.id AS request_id, s.status, s.created_at
+            FROM studio_visit_requests s
+            WHERE s.vocalist_id = %s AND s.kalam_id IN (SELECT kalam_id FROM ids)
+            UNION ALL
+            SELECT 'remote' AS request_type, r.kalam_id, r.id AS request_id, r.status, r.created_at
+            FROM remote_recording_requests r
+            WHERE r.vocalist_id = %s AND r.kalam_id IN (SELECT kalam_id FROM ids)
+        )
+        SELECT DISTINCT ON (ids.kalam_id)
+            ids.kalam_id,
+            b.request_id IS NOT NULL AS is_booked,
+            b.request_type,
+            b.request_id,
+            b.status
+        FROM ids
+        LEFT JOIN bookings b ON b.kalam_id = ids.kalam_id
+        ORDER BY ids.kalam_id, b.created_at DESC NULLS LAST;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (*ids_params, vocalist_id, vocalist_id))
+            return cur.fetchall()
+
     def studio_request_exists(self, vocalist_id: int, kalam_id: int) -> bool:
         query = """
         SELECT 1
@@ -1,6 +1,19 @@
 from psycopg2.extras import RealDictCursor
 from fastapi import HTTPException
 from typing import List, Optional
+from sql.queries.kalamQueries import (
+    submission_stats_columns, submission_stats_payload, dashboard_owners, KALAM_COLUMNS, KALAM_SUMMARY_FIELDS
+)
+from utils.fieldsets import select_list
+from utils.dashboard_stats import dashboard_stats_cache, RECENT_ACTIVITY_DAYS
+
+VOCALIST_KALAM_COLUMNS = {
+    **KALAM_COLUMNS,
+    "status": "ks.status",
+    "vocalist_approval_status": "ks.vocalist_approval_status",
+}
+VOCALIST_KALAM_SUMMARY_FIELDS = KALAM_SUMMARY_FIELDS + ("status", "vocalist_approval_status")
+
 class VocalistQueries:
     def __init__(self, conn):
         self.conn = conn
@@ -79,6 +92,35 @@ class VocalistQueries:
         
         
     
+    def upsert_vocalist_profile(self, user_id, vocal_range=None, languages=None, sample_title=None,
+                                audio_sample_url=None, sample_description=None, experience_background=None,
+                                portfolio=None, availability=None):
+        # One statement for create-or-update; fields left as None keep their stored value
+        query = """
+        INSERT INTO vocalists (
+            user_id, vocal_range, languages, sample_title, audio_sample_url,
+            sample_description, experience_background, portfolio, availability
+        )
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            vocal_range = COALESCE(EXCLUDED.vocal_range, vocalists.vocal_range),
+            languages = COALESCE(EXCLUDED.languages, vocalists.languages),
+            sample_title = COALESCE(EXCLUDED.sample_title, vocalists.sample_title),
+            audio_sample_url = COALESCE(EXCLUDED.audio_sample_url, vocalists.audio_sample_url),
+            sample_description = COALESCE(EXCLUDED.sample_description, vocalists.sample_description),
+            experience_background = COALESCE(EXCLUDED.experience_background, vocalists.experience_background),
+            portfolio = COALESCE(EXCLUDED.portfolio, vocalists.portfolio),
+            availability = COALESCE(EXCLUDED.availability, vocalists.availability),
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING *, (xmax = 0) AS inserted;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (user_id, vocal_range, languages, sample_title,
+                                audio_sample_url, sample_description,
+                                experience_background, portfolio, availability))
+            self.conn.commit()
+            return cur.fetchone()
+
     def is_vocalist_registered(self, user_id: int):
         query = """
         SELECT v.status
@@ -90,9 +132,10 @@ class VocalistQueries:
             cur.execute(query, (user_id,))
             return cur.fetchone()
 
-    def get_kalams_by_vocalist_id(self, vocalist_id: int):
-        query = """
-        SELECT k.*, ks.vocalist_approval_status,ks.status
+    def get_kalams_by_vocalist_id(self, vocalist_id: int, fields: Optional[List[str]] = None):
+        columns = select_list(fields or VOCALIST_KALAM_SUMMARY_FIELDS, VOCALIST_KALAM_COLUMNS)
+        query = f"""
+        SELECT {columns}
         FROM kalams k
         LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
         WHERE k.vocalist_id = %s;
@@ -117,7 +160,9 @@ class VocalistQueries:
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(query, values)
                 submission_result = cur.fetchone()
+                owners = dashboard_owners(cur, kalam_ids=[kalam_id])
                 self.conn.commit()
+                dashboard_stats_cache.invalidate(owners)
                 print("submission_result:", submission_result)
                 return submission_result
 
@@ -132,6 +177,12 @@ class VocalistQueries:
             """
             values = (kalam_id,)
 
+            # Rejections are counted before the assignment is cleared
+            count_rejection_query = """
+            UPDATE vocalists
+            SET assignments_rejected = assignments_rejected + 1
+            WHERE user_id = (SELECT vocalist_id FROM kalams WHERE id = %s);
+            """
             update_kalam_query = """
             UPDATE kalams
             SET vocalist_id = NULL
@@ -140,8 +191,11 @@ class VocalistQueries:
             with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(query, values)
                 submission_result = cur.fetchone()
+                owners = dashboard_owners(cur, kalam_ids=[kalam_id])
+                cur.execute(count_rejection_query, (kalam_id,))
                 cur.execute(update_kalam_query, (kalam_id,))
                 self.conn.commit()
+                dashboard_stats_cache.invalidate(owners)
                 return submission_result
 
 
@@ -167,4 +221,163 @@ class VocalistQueries:
                 vocalists = cur.fetchall()
                 return vocalists
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+
+    def _discovery_filters(self, languages=None, vocal_range=None, country=None, city=None, exclude=None):
+        # exclude names a filter to leave out, for that facet's own counts
+        conditions = ["v.status = 'approved'"]
+        values = []
+        if languages and exclude != "languages":
+            conditions.append("v.languages && %s::text[]")
+            values.append(list(languages))
+        for name, clause, value in (
+            ("vocal_range", "v.vocal_range = %s", vocal_range),
+            ("country", "u.country = %s", country),
+            ("city", "u.city = %s", city),
+        ):
+            if value and exclude != name:
+                conditions.append(clause)
+                values.append(value)
+        return conditions, values
+
+    def discover_vocalists(self, languages=None, vocal_range=None, country=None, city=None,
+                           after_created_at=None, after_id=None, limit: int = 20) -> List[dict]:
+        conditions, values = self._discovery_filters(languages, vocal_range, country, city)
+        if after_created_at is not None and after_id is not None:
+            conditions.append("(v.created_at, v.id) < (%s, %s)")
+            values.extend([after_created_at, after_id])
+        values.append(limit)
+
+        query = f"""
+            SELECT
+                v.id, v.user_id, v.vocal_range, v.languages, v.sample_title,
+                v.audio_sample_url, v.sample_description, v.created_at,
+                u.name AS user_name,
+                u.country AS user_country,
+                u.city AS user_city
+            FROM vocalists v
+            JOIN users u ON v.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY v.created_at DESC, v.id DESC
+            LIMIT %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, values)
+            return cur.fetchall()
+
+    def vocalist_facets(self, languages=None, vocal_range=None, country=None, city=None) -> dict:
+        """
+        Value counts per facet. Each facet is counted with every filter but its
+        own, so the other values of a selected facet stay visible for widening.
+        """
+        facet_queries = {
+            "languages": """
+                SELECT 'languages' AS facet, lang AS value, COUNT(*) AS count
+                FROM vocalists v
+                JOIN users u ON v.user_id = u.id, unnest(v.languages) AS lang
+                WHERE {where}
+                GROUP BY lang
+            """,
+            "vocal_range": """
+                SELECT 'vocal_range', v.vocal_range, COUNT(*)
+                FROM vocalists v
+                JOIN users u ON v.user_id = u.id
+                WHERE {where} AND v.vocal_range IS NOT NULL
+                GROUP BY v.vocal_range
+            """,
+            "country": """
+                SELECT 'country', u.country, COUNT(*)
+                FROM vocalists v
+                JOIN users u ON v.user_id = u.id
+                WHERE {where} AND u.country IS NOT NULL AND u.country <> ''
+                GROUP BY u.country
+            """,
+        }
+        parts = []
+        values = []
+        for facet, facet_query in facet_queries.items():
+            conditions, facet_values = self._discovery_filters(languages, vocal_range, country, city, exclude=facet)
+            parts.append(facet_query.format(where=" AND ".join(conditions)))
+            values.extend(facet_values)
+        query = " UNION ALL ".join(parts) + " ORDER BY facet, count DESC, value;"
+
+        facets = {facet: [] for facet in facet_queries}
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, values)
+            for row in cur.fetchall():
+                facets[row["facet"]].append({"value": row["value"], "count": row["count"]})
+        return facets
+
+    def get_vocalist_stats(self, user_id) -> dict:
+        cached = dashboard_stats_cache.get("vocalist", user_id)
+        if cached is not None:
+            return cached
+
+        query = f"""
+            SELECT
+                COUNT(k.id) AS assigned,
+                COUNT(ks.id) FILTER (WHERE ks.vocalist_approval_status = 'pending') AS awaiting_response,
+                COUNT(ks.id) FILTER (WHERE ks.vocalist_approval_status = 'approved') AS accepted,
+                (SELECT assignments_rejected FROM vocalists WHERE user_id = %s) AS rejected,
+                {submission_stats_columns("ks")},
+                -- kalams.updated_at is stamped on assignment and left alone when the vocalist accepts
+                AVG(GREATEST(EXTRACT(EPOCH FROM ks.updated_at - k.updated_at), 0) / 3600)
+                    FILTER (WHERE ks.status = 'complete_approved' AND ks.vocalist_approval_status = 'approved')
+                    AS hours_to_accept,
+                COUNT(k.id) FILTER (
+                    WHERE GREATEST(k.updated_at, ks.updated_at) >= LOCALTIMESTAMP - make_interval(days => %s)
+                ) AS recently_updated,
+                MAX(GREATEST(k.updated_at, ks.updated_at)) AS last_activity_at
+            FROM kalams k
+            LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+            WHERE k.vocalist_id = %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (user_id, RECENT_ACTIVITY_DAYS, user_id))
+            row = cur.fetchone()
+
+        stats = {
+            "assigned": row["assigned"],
+            "awaiting_response": row["awaiting_response"],
+            "accepted": row["accepted"],
+            "rejected": row["rejected"] or 0,
+            **submission_stats_payload(row),
+            "avg_hours_to_accept": round(float(row["hours_to_accept"]), 2) if row["hours_to_accept"] is not None else None,
+            "recent_activity": {
+                "days": RECENT_ACTIVITY_DAYS,
+                "updated": row["recently_updated"],
+                "last_activity_at": row["last_activity_at"],
+            },
+        }
+        dashboard_stats_cache.set("vocalist", user_id, stats)
+        return stats
+
+    def get_vocalist_features(self) -> List[dict]:
+        """One row per approved vocalist with the raw inputs for assignment ranking."""
+        query = """
+            SELECT
+                v.user_id,
+                u.name,
+                u.country,
+                u.city,
+                v.languages,
+                v.vocal_range,
+                v.assignments_rejected,
+                COUNT(ks.id) FILTER (
+                    WHERE ks.status IN ('final_approved', 'complete_approved')
+                    AND ks.vocalist_approval_status IN ('pending', 'approved')
+                ) AS open_assignments,
+                COUNT(ks.id) FILTER (WHERE ks.vocalist_approval_status = 'approved') AS assignments_approved
+            FROM vocalists v
+            JOIN users u ON u.id = v.user_id
+            LEFT JOIN kalams k ON k.vocalist_id = v.user_id
+            LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+            WHERE v.status = 'approved'
+            GROUP BY v.id, u.id
+            ORDER BY v.user_id;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query)
+            return cur.fetchall()
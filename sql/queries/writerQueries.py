@@ -1,5 +1,7 @@
 from psycopg2.extras import RealDictCursor
 from typing import List, Optional
+from sql.queries.kalamQueries import submission_stats_columns, submission_stats_payload
+from utils.dashboard_stats import dashboard_stats_cache, RECENT_ACTIVITY_DAYS
 
 
 class WriterQueries:
@@ -76,6 +78,74 @@ class WriterQueries:
             self.conn.commit()
             return cur.fetchone()
 
+    def upsert_writer_profile(self, user_id, writing_styles=None, languages=None,
+                              sample_title=None, experience_background=None,
+                              portfolio=None, availability=None):
+        # One statement for create-or-update; fields left as None keep their stored value
+        query = """
+        INSERT INTO writers (
+            user_id, writing_styles, languages, sample_title,
+            experience_background, portfolio, availability
+        )
+        VALUES (%s,%s,%s,%s,%s,%s,%s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            writing_styles = COALESCE(EXCLUDED.writing_styles, writers.writing_styles),
+            languages = COALESCE(EXCLUDED.languages, writers.languages),
+            sample_title = COALESCE(EXCLUDED.sample_title, writers.sample_title),
+            experience_background = COALESCE(EXCLUDED.experience_background, writers.experience_background),
+            portfolio = COALESCE(EXCLUDED.portfolio, writers.portfolio),
+            availability = COALESCE(EXCLUDED.availability, writers.availability),
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING *, (xmax = 0) AS inserted;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (
+                user_id, writing_styles, languages, sample_title,
+                experience_background, portfolio, availability
+            ))
+            self.conn.commit()
+            return cur.fetchone()
+
+    def get_writer_stats(self, user_id) -> dict:
+        cached = dashboard_stats_cache.get("writer", user_id)
+        if cached is not None:
+            return cached
+
+        query = f"""
+            SELECT
+                COUNT(k.id) AS total_kalams,
+                COUNT(k.id) FILTER (WHERE ks.id IS NULL) AS not_submitted,
+                {submission_stats_columns("ks")},
+                AVG(EXTRACT(EPOCH FROM k.published_at - ks.created_at) / 3600)
+                    FILTER (WHERE ks.status = 'posted' AND k.published_at IS NOT NULL) AS hours_to_publish,
+                COUNT(k.id) FILTER (WHERE k.created_at >= LOCALTIMESTAMP - make_interval(days => %s)) AS recently_created,
+                COUNT(k.id) FILTER (
+                    WHERE GREATEST(k.updated_at, ks.updated_at) >= LOCALTIMESTAMP - make_interval(days => %s)
+                ) AS recently_updated,
+                MAX(GREATEST(k.updated_at, ks.updated_at)) AS last_activity_at
+            FROM kalams k
+            LEFT JOIN kalam_submissions ks ON ks.kalam_id = k.id
+            WHERE k.writer_id = %s;
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(query, (RECENT_ACTIVITY_DAYS, RECENT_ACTIVITY_DAYS, user_id))
+            row = cur.fetchone()
+
+        stats = {
+            "total_kalams": row["total_kalams"],
+            "not_submitted": row["not_submitted"],
+            **submission_stats_payload(row),
+            "avg_hours_to_publish": round(float(row["hours_to_publish"]), 2) if row["hours_to_publish"] is not None else None,
+            "recent_activity": {
+                "days": RECENT_ACTIVITY_DAYS,
+                "created": row["recently_created"],
+                "updated": row["recently_updated"],
+                "last_activity_at": row["last_activity_at"],
+            },
+        }
+        dashboard_stats_cache.set("writer", user_id, stats)
+        return stats
+
     def is_writer_registered(self, user_id: int):
         query = """
         SELECT w.id
@@ -0,0 +1,47 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+DASHBOARD_STATS_TTL = int(os.getenv("DASHBOARD_STATS_TTL", 120))
+# Window for the "recent activity" counters, in days
+RECENT_ACTIVITY_DAYS = int(os.getenv("RECENT_ACTIVITY_DAYS", 7))
+
+
+class DashboardStatsCache:
+    """
+    Per-process cache of /me/stats payloads keyed by (role, user_id).
+
+    Kalam transitions drop the entries of the writer and vocalist involved
+    after they commit; the TTL bounds staleness from writes in other workers.
+    """
+
+    def __init__(self, ttl: int = DASHBOARD_STATS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[float, dict]] = {}
+
+    def get(self, role: str, user_id) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((role, str(user_id)))
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def set(self, role: str, user_id, stats: dict):
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if now - v[0] >= self.ttl]:
+                del self._entries[key]
+            self._entries[(role, str(user_id))] = (now, stats)
+
+    def invalidate(self, owners: Iterable[Tuple[str, object]]):
+        with self._lock:
+            for role, user_id in owners:
+                if user_id is not None:
+                    self._entries.pop((role, str(user_id)), None)
+
+
+dashboard_stats_cache = DashboardStatsCache()
@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+# Rows fetched per round trip from the server-side cursor; also one response chunk
+EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", 2000))
+EXPORT_MAX_ITERSIZE = 20000
+# Exports hold a connection for the whole download; past this many at once they get a 503
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 3))
+EXPORT_CONNECT_TIMEOUT_SECONDS = int(os.getenv("EXPORT_CONNECT_TIMEOUT_SECONDS", 5))
+# A client that stops reading for this long has its export cut off server-side
+EXPORT_IDLE_TIMEOUT_SECONDS = int(os.getenv("EXPORT_IDLE_TIMEOUT_SECONDS", 60))
+EXPORT_RETRY_AFTER_SECONDS = 30
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Spreadsheet apps evaluate cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_options(
+    format: str = "ndjson",
+    itersize: int = Query(EXPORT_ITERSIZE, ge=1, le=EXPORT_MAX_ITERSIZE),
+) -> dict:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return {"format": format, "itersize": itersize}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_value, ensure_ascii=False)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _ndjson_chunks(batches: Iterable[List[dict]]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(row, default=_json_value, ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def _csv_chunks(columns: List[str], batches: Iterable[List[dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[column]) for column in columns] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _export_pool() -> ThreadedConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(
+                0, EXPORT_MAX_CONCURRENT, os.getenv("DATABASE_URL"),
+                connect_timeout=EXPORT_CONNECT_TIMEOUT_SECONDS,
+                options=f"-c idle_in_transaction_session_timeout={EXPORT_IDLE_TIMEOUT_SECONDS * 1000}",
+            )
+        return _pool
+
+
+class _ExportBatches:
+    """Row batches from an open named cursor; gives the connection back to the pool exactly once."""
+
+    def __init__(self, pool, conn, cur, first: List[dict], itersize: int):
+        self._pool = pool
+        self._conn = conn
+        self._cur = cur
+        self._first = first
+        self._itersize = itersize
+        self._lock = threading.Lock()
+        self._released = False
+
+    def __iter__(self) -> Iterator[List[dict]]:
+        try:
+            rows = self._first
+            self._first = None
+            while rows:
+                yield rows
+                rows = self._cur.fetchmany(self._itersize)
+        finally:
+            self.release()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        # putconn rolls back the read-only transaction, closing the cursor
+        self._pool.putconn(self._conn, close=bool(self._conn.closed))
+
+    # Covers responses whose body was never iterated
+    __del__ = release
+
+
+def stream_export(query: str, values, format: str, filename: str,
+                  itersize: int = EXPORT_ITERSIZE) -> StreamingResponse:
+    """
+    Stream a query's rows as NDJSON or CSV from a named (server-side) cursor,
+    holding at most `itersize` rows in memory at a time.
+
+    Exports run on a small pool of their own read-only connections, so a long
+    download neither blocks the shared connection nor has its cursor closed
+    by another request's commit, and at most EXPORT_MAX_CONCURRENT run at
+    once. The first batch is fetched before responding, so query errors still
+    surface as an HTTP error rather than a cut-off body.
+    """
+    pool = _export_pool()
+    try:
+        conn = pool.getconn()
+    except PoolError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports in progress, try again shortly",
+            headers={"Retry-After": str(EXPORT_RETRY_AFTER_SECONDS)}
+        )
+    try:
+        conn.set_session(readonly=True)
+        cur = conn.cursor(name="export", cursor_factory=RealDictCursor)
+        cur.itersize = itersize
+        cur.execute(query, values)
+        first = cur.fetchmany(itersize)
+        columns = [column.name for column in cur.description]
+    except Exception:
+        pool.putconn(conn, close=True)
+        raise
+
+    batches = _ExportBatches(pool, conn, cur, first, itersize)
+    chunks = _csv_chunks(columns, batches) if format == "csv" else _ndjson_chunks(batches)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format}"',
+            "X-Accel-Buffering": "no",
+        },
+        # Also runs when the body was never sent
+        background=BackgroundTask(batches.release)
+    )
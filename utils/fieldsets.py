@@ -0,0 +1,29 @@
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], columns: Dict[str, str], default: Iterable[str]) -> List[str]:
+    """
+    Resolve a `?fields=a,b,c` parameter against an endpoint's column map.
+    Missing means `default`, `all` means every column; `id` is always kept.
+    """
+    if not fields:
+        return list(default)
+    if fields.strip() == "all":
+        return list(columns)
+
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(columns)}"
+        )
+    if "id" in columns and "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def select_list(fields: Iterable[str], columns: Dict[str, str]) -> str:
+    """SQL select list for already-validated field names; only map values reach the query."""
+    return ", ".join(f"{columns[field]} AS {field}" for field in fields)
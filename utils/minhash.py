@@ -0,0 +1,58 @@
+import hashlib
+import os
+from typing import List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from utils.script_normalization import fold
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+# Estimated Jaccard similarity of kalam_text shingles above which a
+# submission is flagged as a probable duplicate of an earlier kalam
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.8))
+
+# Changing any of these invalidates stored signatures; rerun the scan
+SHINGLE_WORDS = 3
+PERMUTATIONS = 128
+# 16 bands of 8 rows: a pair at 0.8 similarity shares a band ~95% of the time,
+# one at 0.5 about 6%
+BANDS = 16
+ROWS_PER_BAND = PERMUTATIONS // BANDS
+
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(20240611)
+# a * x stays below 2**64 since both are 32-bit
+_A = _rng.integers(1, 1 << 32, size=PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, size=PERMUTATIONS, dtype=np.uint64)
+
+
+def _hash32(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=4).digest(), "little")
+
+
+def shingles(text: str) -> set:
+    """Word SHINGLE_WORDS-grams of the folded text, so diacritics and letter variants don't count as edits."""
+    tokens = fold(text).split()
+    if len(tokens) < SHINGLE_WORDS:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: Optional[str]) -> Optional[List[int]]:
+    """MinHash signature as PERMUTATIONS signed 32-bit ints (an INT[] column), or None for empty text."""
+    grams = shingles(text or "")
+    if not grams:
+        return None
+    hashes = np.fromiter((_hash32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % MERSENNE_PRIME & np.uint64(0xFFFFFFFF)
+    return permuted.min(axis=1).astype(np.uint32).view(np.int32).tolist()
+
+
+def band_hashes(sig: List[int]) -> List[int]:
+    """One signed 64-bit bucket per band; the band number is hashed in so buckets never collide across bands."""
+    values = np.asarray(sig, dtype=np.int32)
+    buckets = []
+    for band in range(BANDS):
+        chunk = values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
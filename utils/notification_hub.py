@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sql.queries.notificationQueries import NOTIFICATION_CHANNEL
+
+RECONNECT_DELAY_SECONDS = 5
+CONNECT_TIMEOUT_SECONDS = 5
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class NotificationHub:
+    """
+    One LISTEN connection per worker process, fanned out to SSE subscribers.
+
+    The psycopg2 connection's socket is registered with the event loop via
+    add_reader, so idle subscribers cost one asyncio.Queue each and no threads.
+    Connecting and LISTEN are blocking, so they run in the default executor.
+    """
+
+    def __init__(self, channel: str = NOTIFICATION_CHANNEL):
+        self.channel = channel
+        self._conn = None
+        self._loop = None
+        self._start_lock = asyncio.Lock()
+        # user_id -> {queue: role}
+        self._subscribers = {}
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def start(self):
+        async with self._start_lock:
+            if self._conn is not None and not self._conn.closed:
+                return
+            self._loop = asyncio.get_running_loop()
+            conn = await self._loop.run_in_executor(None, self._connect)
+            self._conn = conn
+            self._loop.add_reader(conn.fileno(), self._on_readable)
+
+    def _connect(self):
+        conn = psycopg2.connect(os.getenv("DATABASE_URL"), connect_timeout=CONNECT_TIMEOUT_SECONDS)
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel};")
+        except psycopg2.Error:
+            conn.close()
+            raise
+        return conn
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            print("Notification listener lost connection:", e)
+            self._reset()
+            self._loop.call_later(RECONNECT_DELAY_SECONDS, self._schedule_restart)
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self.dispatch(payload)
+
+    def _schedule_restart(self):
+        if self._subscribers:
+            self._loop.create_task(self._restart())
+
+    async def _restart(self):
+        try:
+            await self.start()
+        except psycopg2.Error as e:
+            print("Notification listener reconnect failed:", e)
+            self._loop.call_later(RECONNECT_DELAY_SECONDS, self._schedule_restart)
+
+    def _reset(self):
+        if self._conn is not None:
+            try:
+                self._loop.remove_reader(self._conn.fileno())
+            except (ValueError, OSError, psycopg2.InterfaceError):
+                pass
+            if not self._conn.closed:
+                self._conn.close()
+        self._conn = None
+
+    def _recipients(self, payload: dict):
+        target_type = payload.get("target_type")
+        if target_type == "specific":
+            for user_id in payload.get("target_user_ids") or []:
+                for queue, role in self._subscribers.get(str(user_id), {}).items():
+                    if role != "admin":
+                        yield queue
+            return
+
+        role_filter = {"writers": "writer", "vocalists": "vocalist"}.get(target_type)
+        for queues in self._subscribers.values():
+            for queue, role in queues.items():
+                if role == "admin":
+                    continue
+                if role_filter is None or role == role_filter:
+                    yield queue
+
+    def dispatch(self, payload: dict):
+        for queue in self._recipients(payload):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow client; it can catch up from the inbox on reconnect
+                pass
+
+    async def subscribe(self, user_id, role: str) -> asyncio.Queue:
+        await self.start()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(str(user_id), {})[queue] = role
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue):
+        queues = self._subscribers.get(str(user_id))
+        if not queues:
+            return
+        queues.pop(queue, None)
+        if not queues:
+            del self._subscribers[str(user_id)]
+
+
+notification_hub = NotificationHub()
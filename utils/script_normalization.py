@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from typing import Iterable, List, Tuple
+
+# Folding runs on NFKD text, so hamza/madda carriers (آ أ ئ ؤ ۂ) have
+# already been split into base letter + combining mark by the time these
+# tables apply.
+ARABIC_LETTER_VARIANTS = str.maketrans({
+    "ك": "ک",  # Arabic kaf
+    "ي": "ی",  # Arabic yeh
+    "ى": "ی",  # alef maksura
+    "ے": "ی",  # bari yeh
+    "ه": "ہ",  # Arabic heh
+    "ە": "ہ",  # ae
+    "ة": "ت",  # teh marbuta
+    "ٱ": "ا",  # alef wasla
+    "\u0640": None,  # tatweel
+    "\u200c": None,  # zero-width non-joiner
+    "\u200d": None,  # zero-width joiner
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + i): str(i) for i in range(10)},  # Extended (Urdu) digits
+})
+
+GURMUKHI_NUKTA = "\u0a3c"
+GURMUKHI_NASALS = ("\u0a70", "\u0a02")  # tippi, bindi
+# Combining marks that change the consonant skeleton and survive folding
+KEPT_MARKS = (GURMUKHI_NUKTA,) + GURMUKHI_NASALS
+
+# Consonant skeleton shared by all three scripts. Vowels, vowel carriers
+# (ا و ی ع ء, w/y), aspiration (ھ, the h in bh/dh/...) and a word-final h
+# are dropped and q is read as k, so "ishq", "ishaq", "عشق" and "ਇਸ਼ਕ"
+# all become "xk".
+ROMAN_DIGRAPHS = [
+    ("sh", "x"), ("ch", "c"), ("kh", "k"), ("gh", "g"), ("ph", "f"), ("zh", "z"),
+    ("th", "t"), ("dh", "d"), ("bh", "b"), ("jh", "j"), ("rh", "r"),
+]
+ROMAN_LETTERS = {
+    "b": "b", "c": "c", "d": "d", "f": "f", "g": "g", "h": "h", "j": "j", "k": "k",
+    "l": "l", "m": "m", "n": "n", "p": "p", "q": "k", "r": "r", "s": "s", "t": "t",
+    "x": "x", "z": "z",
+}
+ARABIC_SCRIPT_LETTERS = {
+    "ب": "b", "پ": "p", "ت": "t", "ٹ": "t", "ث": "s", "ج": "j", "چ": "c", "ح": "h",
+    "خ": "k", "د": "d", "ڈ": "d", "ذ": "z", "ر": "r", "ڑ": "r", "ز": "z", "ژ": "z",
+    "س": "s", "ش": "x", "ص": "s", "ض": "z", "ط": "t", "ظ": "z", "غ": "g", "ف": "f",
+    "ق": "k", "ک": "k", "گ": "g", "ل": "l", "م": "m", "ن": "n", "ں": "n", "ہ": "h",
+    "ۃ": "t",
+}
+GURMUKHI_LETTERS = {
+    "ਕ": "k", "ਖ": "k", "ਗ": "g", "ਘ": "g", "ਙ": "n", "ਚ": "c", "ਛ": "c", "ਜ": "j",
+    "ਝ": "j", "ਞ": "n", "ਟ": "t", "ਠ": "t", "ਡ": "d", "ਢ": "d", "ਣ": "n", "ਤ": "t",
+    "ਥ": "t", "ਦ": "d", "ਧ": "d", "ਨ": "n", "ਪ": "p", "ਫ": "f", "ਬ": "b", "ਭ": "b",
+    "ਮ": "m", "ਰ": "r", "ਲ": "l", "ਸ": "s", "ਹ": "h", "ੜ": "r",
+}
+GURMUKHI_NUKTA_LETTERS = {"ਸ": "x", "ਖ": "k", "ਗ": "g", "ਜ": "z", "ਫ": "f", "ਲ": "l", "ਕ": "k"}
+
+TOKEN_RE = re.compile(r"[\w\u0a3c\u0a70\u0a02]+")
+LONE_C_RE = re.compile(r"c(?!h)")
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase, strip diacritics (Latin accents, Arabic harakat, Gurmukhi
+    vowel signs) and unify letter variants, returning space-joined tokens.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(
+        ch for ch in text
+        if not unicodedata.category(ch).startswith("M") or ch in KEPT_MARKS
+    )
+    text = text.translate(ARABIC_LETTER_VARIANTS).replace("'", "").replace("\u2019", "")
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(TOKEN_RE.findall(text))
+
+
+def transliteration_key(token: str) -> str:
+    """Script-independent consonant skeleton of one folded token."""
+    out: List[str] = []
+    if token.isascii():
+        # A lone c is a k ("qalandar"/"calandar"); ch is handled as a digraph
+        word = LONE_C_RE.sub("k", token.replace("x", "ks"))
+        for digraph, key in ROMAN_DIGRAPHS:
+            word = word.replace(digraph, key)
+        out = [ROMAN_LETTERS.get(ch, ch if ch.isdigit() else "") for ch in word]
+    else:
+        i = 0
+        while i < len(token):
+            ch = token[i]
+            if i + 1 < len(token) and token[i + 1] == GURMUKHI_NUKTA:
+                out.append(GURMUKHI_NUKTA_LETTERS.get(ch, GURMUKHI_LETTERS.get(ch, "")))
+                i += 2
+                continue
+            if ch.isdigit():
+                out.append(ch)
+            elif ch in GURMUKHI_NASALS:
+                out.append("n")
+            else:
+                out.append(ARABIC_SCRIPT_LETTERS.get(ch) or GURMUKHI_LETTERS.get(ch) or "")
+            i += 1
+
+    key = []
+    for ch in "".join(out):
+        if not key or key[-1] != ch:  # doubled letters are spelled inconsistently
+            key.append(ch)
+    if len(key) > 1 and key[-1] == "h":  # "shah"/"شاہ", "bulleh"/"بلھے"
+        key.pop()
+    return "".join(key)
+
+
+def search_keys(texts: Iterable[str]) -> Tuple[str, str]:
+    """
+    (normalized_text, transliteration_keys) for the given fields, in the
+    form stored in kalam_search_documents and matched with pg_trgm.
+    """
+    normalized = " ".join(filter(None, (fold(text) for text in texts)))
+    keys = [transliteration_key(token) for token in normalized.split()]
+    return normalized, " ".join(key for key in keys if key)
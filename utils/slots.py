@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+import time as _time
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+STUDIO_TIMEZONE_NAME = os.getenv("STUDIO_TIMEZONE", "UTC")
+STUDIO_TIMEZONE = ZoneInfo(STUDIO_TIMEZONE_NAME)
+SLOT_MINUTES = int(os.getenv("STUDIO_SLOT_MINUTES", 60))
+# Bookable hours per day, in studio local time
+STUDIO_OPEN_HOUR = int(os.getenv("STUDIO_OPEN_HOUR", 10))
+STUDIO_CLOSE_HOUR = int(os.getenv("STUDIO_CLOSE_HOUR", 18))
+AVAILABILITY_CACHE_TTL = int(os.getenv("AVAILABILITY_CACHE_TTL", 300))
+
+TIME_RE = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?(?:\s*([ap])\.?\s*m\.?)?", re.IGNORECASE)
+RANGE_SPLIT_RE = re.compile(r"\s*(?:-|–|—|\bto\b|\buntil\b)\s*", re.IGNORECASE)
+
+
+def parse_time(text: str) -> Optional[time]:
+    match = TIME_RE.fullmatch(text.strip())
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def parse_preferred_slot(preferred_date, preferred_time: Optional[str]) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Turn the free-text preferred_time ("10:00", "2 pm", "10am - 12pm") on
+    preferred_date into a timezone-aware [start, end) range. A single time
+    gets the default slot length. Returns None when the text can't be parsed.
+    """
+    if not preferred_date or not preferred_time:
+        return None
+    if isinstance(preferred_date, str):
+        preferred_date = datetime.strptime(preferred_date, "%Y-%m-%d").date()
+
+    parts = [p for p in RANGE_SPLIT_RE.split(preferred_time.strip()) if p]
+    if not 1 <= len(parts) <= 2:
+        return None
+
+    # "10 - 12 pm": let the start borrow the end's meridiem
+    if len(parts) == 2 and not re.search(r"[ap]\.?\s*m", parts[0], re.IGNORECASE):
+        suffix = re.search(r"[ap]\.?\s*m\.?$", parts[1], re.IGNORECASE)
+        start_time = parse_time(parts[0])
+        if suffix and start_time and start_time.hour <= 12:
+            borrowed = parse_time(parts[0] + suffix.group(0))
+            end_time = parse_time(parts[1])
+            if borrowed and end_time and borrowed < end_time:
+                start_time = borrowed
+    else:
+        start_time = parse_time(parts[0])
+    if start_time is None:
+        return None
+
+    start = datetime.combine(preferred_date, start_time, tzinfo=STUDIO_TIMEZONE)
+    if len(parts) == 2:
+        end_time = parse_time(parts[1])
+        if end_time is None:
+            return None
+        end = datetime.combine(preferred_date, end_time, tzinfo=STUDIO_TIMEZONE)
+    else:
+        end = start + timedelta(minutes=SLOT_MINUTES)
+
+    if end <= start:
+        return None
+    return start, end
+
+
+class AvailabilityCache:
+    """
+    Per-process cache of free slots keyed by (kind, day).
+
+    Entries are dropped when a booking on that day is created or changes
+    status; the TTL bounds staleness from writes in other workers.
+    """
+
+    def __init__(self, ttl: int = AVAILABILITY_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._days: Dict[Tuple[str, date], Tuple[float, List[dict]]] = {}
+
+    def get_days(self, kind: str, days: List[date]) -> Dict[date, List[dict]]:
+        now = _time.monotonic()
+        found = {}
+        with self._lock:
+            for day in days:
+                entry = self._days.get((kind, day))
+                if entry and now - entry[0] < self.ttl:
+                    found[day] = entry[1]
+        return found
+
+    def set_days(self, kind: str, slots_by_day: Dict[date, List[dict]]):
+        now = _time.monotonic()
+        with self._lock:
+            for key in [k for k, v in self._days.items() if now - v[0] >= self.ttl]:
+                del self._days[key]
+            for day, slots in slots_by_day.items():
+                self._days[(kind, day)] = (now, slots)
+
+    def invalidate(self, kind: str, day=None):
+        with self._lock:
+            if day is None:
+                for key in [k for k in self._days if k[0] == kind]:
+                    del self._days[key]
+                return
+            if isinstance(day, str):
+                day = datetime.strptime(day, "%Y-%m-%d").date()
+            self._days.pop((kind, day), None)
+
+
+availability_cache = AvailabilityCache()
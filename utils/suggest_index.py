@@ -0,0 +1,293 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import psycopg2
+from psycopg2.extras import DictCursor
+from dotenv import load_dotenv
+from utils.script_normalization import fold
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+logger = logging.getLogger(__name__)
+
+# Incremental refresh interval, and how often to rebuild from scratch (picks
+# up deleted users/kalams and YouTube view counts, which carry no updated_at)
+SUGGEST_REFRESH_SECONDS = int(os.getenv("SUGGEST_REFRESH_SECONDS", 30))
+SUGGEST_REBUILD_SECONDS = int(os.getenv("SUGGEST_REBUILD_SECONDS", 3600))
+# Rows stamped by transactions still open when the watermark was taken
+SUGGEST_WATERMARK_OVERLAP = int(os.getenv("SUGGEST_WATERMARK_OVERLAP", 5))
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", 10))
+SUGGEST_CACHE_PREFIXES = int(os.getenv("SUGGEST_CACHE_PREFIXES", 50000))
+SUGGEST_CONNECT_TIMEOUT_SECONDS = int(os.getenv("SUGGEST_CONNECT_TIMEOUT_SECONDS", 5))
+
+# A title is suggested for prefixes of each of its first few words onwards
+MAX_KEY_TOKENS = 8
+MAX_KEY_LENGTH = 64
+# Prefixes this short match most of the index; their top-K is kept warm
+WARM_PREFIX_LENGTH = 2
+# Longer prefixes match a handful of keys and are cheaper to scan than cache
+MAX_CACHED_PREFIX_LENGTH = 24
+
+VIEW_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+
+def parse_views(views: Optional[str]) -> float:
+    """youtube_videos.views is stored pre-formatted ("950", "1.2K", "3.4M")."""
+    if not views:
+        return 0.0
+    views = views.strip().upper().replace(",", "")
+    try:
+        if views[-1] in VIEW_SUFFIXES:
+            return float(views[:-1]) * VIEW_SUFFIXES[views[-1]]
+        return float(views)
+    except ValueError:
+        return 0.0
+
+
+def suggestion_keys(label: str) -> Tuple[str, ...]:
+    """Folded label starting at each of its first MAX_KEY_TOKENS words."""
+    tokens = fold(label).split()
+    keys = {" ".join(tokens[i:])[:MAX_KEY_LENGTH] for i in range(min(len(tokens), MAX_KEY_TOKENS))}
+    return tuple(sorted(keys))
+
+
+def _prefixes(keys: Iterable[str]) -> set:
+    return {key[:i] for key in keys for i in range(1, min(len(key), MAX_CACHED_PREFIX_LENGTH) + 1)}
+
+
+class PrefixIndex:
+    """
+    Sorted (key, id) array searched with bisect, plus a memo of the top-K
+    ids per prefix by popularity. Not thread-safe; SuggestIndex locks it.
+    """
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K):
+        self.top_k = top_k
+        self._items: Dict[int, Tuple[str, float, Tuple[str, ...]]] = {}
+        self._keys: List[Tuple[str, int]] = []
+        self._top: Dict[str, List[int]] = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def _rank(self, ref_id: int):
+        label, popularity, _ = self._items[ref_id]
+        return (-popularity, label.lower(), ref_id)
+
+    def _compute(self, prefix: str) -> List[int]:
+        lo = bisect_left(self._keys, (prefix,))
+        hi = bisect_left(self._keys, (prefix + "\U0010ffff",))
+        ids = {ref_id for _, ref_id in self._keys[lo:hi]}
+        return heapq.nsmallest(self.top_k, ids, key=self._rank)
+
+    def load(self, items: Iterable[Tuple[int, str, float]]):
+        for ref_id, label, popularity in items:
+            keys = suggestion_keys(label)
+            if keys:
+                self._items[ref_id] = (label, popularity, keys)
+        self._keys = sorted((key, ref_id) for ref_id, (_, _, keys) in self._items.items() for key in keys)
+        self._top = {}
+        self.warm({key[:i] for key, _ in self._keys for i in range(1, WARM_PREFIX_LENGTH + 1)})
+
+    def warm(self, prefixes: Iterable[str]):
+        for prefix in prefixes:
+            if len(prefix) <= WARM_PREFIX_LENGTH and prefix not in self._top:
+                self._top[prefix] = self._compute(prefix)
+
+    def _drop_keys(self, ref_id: int, keys: Iterable[str]):
+        for key in keys:
+            i = bisect_left(self._keys, (key, ref_id))
+            if i < len(self._keys) and self._keys[i] == (key, ref_id):
+                self._keys.pop(i)
+
+    def remove(self, ref_id: int) -> set:
+        """Drop an entry; returns the warm prefixes that need recomputing."""
+        old = self._items.pop(ref_id, None)
+        if old is None:
+            return set()
+        self._drop_keys(ref_id, old[2])
+        dropped = set()
+        for prefix in _prefixes(old[2]):
+            if ref_id in self._top.get(prefix, ()):
+                del self._top[prefix]
+                dropped.add(prefix)
+        return dropped
+
+    def upsert(self, ref_id: int, label: str, popularity: float) -> set:
+        """Add or update an entry; returns the warm prefixes that need recomputing."""
+        keys = suggestion_keys(label)
+        old = self._items.get(ref_id)
+        if old == (label, popularity, keys):
+            return set()
+        if not keys:
+            return self.remove(ref_id)
+
+        old_rank = self._rank(ref_id) if old else None
+        if old:
+            self._drop_keys(ref_id, old[2])
+        self._items[ref_id] = (label, popularity, keys)
+        for key in keys:
+            insort(self._keys, (key, ref_id))
+        new_rank = self._rank(ref_id)
+        new_prefixes = _prefixes(keys)
+
+        dropped = set()
+        for prefix in new_prefixes | _prefixes(old[2] if old else ()):
+            top = self._top.get(prefix)
+            if top is None:
+                continue
+            if ref_id in top:
+                if prefix in new_prefixes and new_rank <= old_rank:
+                    top.sort(key=self._rank)
+                    continue
+                # Fell in rank or no longer matches; something else may take its place
+                del self._top[prefix]
+                dropped.add(prefix)
+            elif prefix in new_prefixes and (len(top) < self.top_k or new_rank < self._rank(top[-1])):
+                top.append(ref_id)
+                top.sort(key=self._rank)
+                del top[self.top_k:]
+        return dropped
+
+    def top(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        ids = self._top.get(prefix)
+        if ids is None:
+            ids = self._compute(prefix)
+            if len(prefix) <= MAX_CACHED_PREFIX_LENGTH:
+                if len(self._top) >= SUGGEST_CACHE_PREFIXES:
+                    for key in [p for p in self._top if len(p) > WARM_PREFIX_LENGTH]:
+                        del self._top[key]
+                self._top[prefix] = ids
+        return [(ref_id, self._items[ref_id][0]) for ref_id in ids[:limit]]
+
+
+class SuggestIndex:
+    """
+    In-memory type-ahead over posted kalam titles and writer/vocalist names.
+
+    Built once from get_suggestion_sources(), then patched every
+    SUGGEST_REFRESH_SECONDS with the rows whose updated_at moved past the
+    last watermark. Refreshes run in a background thread started by start(),
+    so requests only ever read memory; until the first build finishes they
+    get empty suggestions.
+    """
+
+    KINDS = ("kalams", "writers", "vocalists")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._indexes = {kind: PrefixIndex() for kind in self.KINDS}
+        self._watermark = None
+        self._checked_at = None
+        self._built_at = None
+        self._thread = None
+
+    def is_stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= SUGGEST_REFRESH_SECONDS
+
+    @staticmethod
+    def _entries(sources: dict):
+        """(kind, id, label, popularity) per row; popularity None means not eligible."""
+        for row in sources["kalams"]:
+            yield "kalams", row["id"], row["title"], parse_views(row["views"]) if row["posted"] else None
+        for row in sources["people"]:
+            posted = row["posted_kalams"]
+            if row["role"] == "writer":
+                yield "writers", row["id"], row["name"], float(posted) if posted else None
+            else:
+                eligible = posted or row["vocalist_status"] == "approved"
+                yield "vocalists", row["id"], row["name"], float(posted) if eligible else None
+
+    def refresh(self, db, force: bool = False):
+        if not (force or self.is_stale()):
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # another request is already refreshing
+        try:
+            now = time.monotonic()
+            rebuild = force or self._built_at is None or now - self._built_at >= SUGGEST_REBUILD_SECONDS
+            since = None if rebuild else self._watermark - timedelta(seconds=SUGGEST_WATERMARK_OVERLAP)
+            sources = db.get_suggestion_sources(since)
+
+            if rebuild:
+                items = {kind: [] for kind in self.KINDS}
+                for kind, ref_id, label, popularity in self._entries(sources):
+                    if popularity is not None and label:
+                        items[kind].append((ref_id, label, popularity))
+                indexes = {kind: PrefixIndex() for kind in self.KINDS}
+                for kind, index in indexes.items():
+                    index.load(items[kind])
+                with self._lock:
+                    self._indexes = indexes
+                self._built_at = now
+            else:
+                with self._lock:
+                    dropped = {kind: set() for kind in self.KINDS}
+                    for kind, ref_id, label, popularity in self._entries(sources):
+                        index = self._indexes[kind]
+                        if popularity is None or not label:
+                            dropped[kind] |= index.remove(ref_id)
+                        else:
+                            dropped[kind] |= index.upsert(ref_id, label, popularity)
+                    for kind, prefixes in dropped.items():
+                        self._indexes[kind].warm(prefixes)
+
+            self._watermark = sources["watermark"]
+            self._checked_at = now
+        finally:
+            self._refresh_lock.release()
+
+    def start(self, queries):
+        """
+        Start the refresh thread once. `queries` wraps a connection in the
+        object get_suggestion_sources() is called on (the Queries class).
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(queries,), name="suggest-index", daemon=True)
+        self._thread.start()
+
+    def _run(self, queries):
+        # Its own read-only connection: the shared one carries request transactions
+        conn = None
+        while True:
+            try:
+                if conn is None or conn.closed:
+                    conn = psycopg2.connect(
+                        os.getenv("DATABASE_URL"),
+                        cursor_factory=DictCursor,
+                        connect_timeout=SUGGEST_CONNECT_TIMEOUT_SECONDS,
+                    )
+                    conn.set_session(readonly=True)
+                try:
+                    self.refresh(queries(conn))
+                finally:
+                    # End the transaction so no snapshot or locks outlive the refresh
+                    if not conn.closed:
+                        conn.rollback()
+            except Exception:
+                logger.exception("Suggest index refresh failed")
+                if conn is not None and not conn.closed:
+                    conn.close()
+                conn = None
+            time.sleep(SUGGEST_REFRESH_SECONDS)
+
+    def suggest(self, q: str, limit: int = SUGGEST_TOP_K) -> dict:
+        prefix = fold(q)[:MAX_KEY_LENGTH]
+        results = {kind: [] for kind in self.KINDS}
+        if not prefix:
+            return results
+        with self._lock:
+            for kind, index in self._indexes.items():
+                label_field = "title" if kind == "kalams" else "name"
+                results[kind] = [{"id": ref_id, label_field: label} for ref_id, label in index.top(prefix, limit)]
+        return results
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,40 @@
+import difflib
+import json
+from typing import List, Optional
+
+
+def _lines(text: Optional[str]) -> List[str]:
+    return (text or "").splitlines(keepends=True)
+
+
+def make_delta(old: Optional[str], new: Optional[str]) -> list:
+    """
+    Line edits turning `old` into `new`, as [start, end, replacement_lines]
+    against the old line list: the JSONB stored on delta revisions.
+    """
+    a, b = _lines(old), _lines(new)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [[i1, i2, b[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def apply_delta(old: Optional[str], delta: list) -> str:
+    a = _lines(old)
+    out = []
+    pos = 0
+    for start, end, lines in delta:
+        out.extend(a[pos:start])
+        out.extend(lines)
+        pos = end
+    out.extend(a[pos:])
+    return "".join(out)
+
+
+def delta_size(delta: list) -> int:
+    return len(json.dumps(delta, ensure_ascii=False))
+
+
+def unified_diff(old: Optional[str], new: Optional[str], old_label: str, new_label: str) -> str:
+    # Terminate the last line so it doesn't run into the next diff line
+    a = [line if line.endswith("\n") else line + "\n" for line in _lines(old)]
+    b = [line if line.endswith("\n") else line + "\n" for line in _lines(new)]
+    return "".join(difflib.unified_diff(a, b, fromfile=old_label, tofile=new_label))
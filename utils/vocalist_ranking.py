@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from typing import List, Optional
+import numpy as np
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+VOCALIST_FEATURES_TTL = int(os.getenv("VOCALIST_FEATURES_TTL", 600))
+
+# Score weights; language fit dominates, workload pushes busy vocalists down
+WEIGHT_LANGUAGE = 3.0
+WEIGHT_ACCEPTANCE = 2.0
+WEIGHT_WORKLOAD = 1.5
+WEIGHT_REGION = 0.5
+
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+class VocalistRanker:
+    """
+    Feature matrix of approved vocalists, rebuilt from one aggregate query
+    at most every VOCALIST_FEATURES_TTL seconds and scored with NumPy.
+    """
+
+    def __init__(self, ttl: int = VOCALIST_FEATURES_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = None
+        self.rows = []
+        self.language_index = {}
+        self.country_index = {}
+
+    def is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at >= self.ttl
+
+    def build(self, rows: List[dict]):
+        language_index = {}
+        country_index = {}
+        for row in rows:
+            for language in row["languages"] or []:
+                language_index.setdefault(_normalize(language), len(language_index))
+            country_index.setdefault(_normalize(row["country"]), len(country_index))
+
+        n = len(rows)
+        languages = np.zeros((n, max(len(language_index), 1)), dtype=bool)
+        countries = np.empty(n, dtype=np.int32)
+        for i, row in enumerate(rows):
+            for language in row["languages"] or []:
+                languages[i, language_index[_normalize(language)]] = True
+            countries[i] = country_index[_normalize(row["country"])]
+
+        approved = np.array([row["assignments_approved"] for row in rows], dtype=np.float64)
+        rejected = np.array([row["assignments_rejected"] for row in rows], dtype=np.float64)
+        workload = np.array([row["open_assignments"] for row in rows], dtype=np.float64)
+
+        with self._lock:
+            self.rows = rows
+            self.language_index = language_index
+            self.country_index = country_index
+            self.languages = languages
+            self.countries = countries
+            # Laplace-smoothed so vocalists without history start at 0.5
+            self.acceptance = (approved + 1.0) / (approved + rejected + 2.0)
+            self.workload = workload
+            self._built_at = time.monotonic()
+
+    def refresh(self, db, force: bool = False):
+        if force or self.is_stale():
+            self.build(db.get_vocalist_features())
+
+    def rank(self, language: Optional[str], country: Optional[str], limit: int = 10) -> List[dict]:
+        with self._lock:
+            rows = self.rows
+            if not rows:
+                return []
+            n = len(rows)
+
+            lang_col = self.language_index.get(_normalize(language))
+            language_match = self.languages[:, lang_col].astype(np.float64) if lang_col is not None else np.zeros(n)
+
+            country_id = self.country_index.get(_normalize(country)) if _normalize(country) else None
+            region_match = (self.countries == country_id).astype(np.float64) if country_id is not None else np.zeros(n)
+
+            load_penalty = self.workload / (self.workload + 1.0)
+            scores = (
+                WEIGHT_LANGUAGE * language_match
+                + WEIGHT_ACCEPTANCE * self.acceptance
+                - WEIGHT_WORKLOAD * load_penalty
+                + WEIGHT_REGION * region_match
+            )
+
+            k = min(limit, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            return [
+                {
+                    "vocalist_id": rows[i]["user_id"],
+                    "name": rows[i]["name"],
+                    "country": rows[i]["country"],
+                    "city": rows[i]["city"],
+                    "languages": rows[i]["languages"],
+                    "vocal_range": rows[i]["vocal_range"],
+                    "score": round(float(scores[i]), 4),
+                    "language_match": bool(language_match[i]),
+                    "region_match": bool(region_match[i]),
+                    "acceptance_rate": round(float(self.acceptance[i]), 4),
+                    "open_assignments": int(self.workload[i]),
+                }
+                for i in top
+            ]
+
+
+vocalist_ranker = VocalistRanker()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+YOUTUBE_CACHE_DIR = os.getenv("YOUTUBE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "youtube_cache"))
+YOUTUBE_CACHE_MAX_BYTES = int(os.getenv("YOUTUBE_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+
+# Quota cost per call of the YouTube Data API v3 resources we use.
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+    "playlistItems": 1,
+}
+
+
+def cache_key_url(url: str) -> str:
+    """Normalize a request URL for caching: drop the API key and sort the query."""
+    parts = urlsplit(url)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "key")
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), ""))
+
+
+def quota_cost(url: str) -> int:
+    resource = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return QUOTA_COSTS.get(resource, 1)
+
+
+class YouTubeResponseCache:
+    """
+    On-disk ETag cache for YouTube Data API responses.
+
+    One JSON file per normalized URL holds the ETag and body. The file mtime
+    is the LRU clock: hits touch it, and stores evict the oldest files once
+    the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = YOUTUBE_CACHE_DIR, max_bytes: int = YOUTUBE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "stored": 0,
+            "evicted": 0,
+            "quota_units_used": 0,
+            "quota_units_saved": 0,
+        }
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(cache_key_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, url: str) -> dict | None:
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def touch(self, url: str):
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def put(self, url: str, etag: str, body: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        data = json.dumps({"url": cache_key_url(url), "etag": etag, "body": body})
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+
+        with self._lock:
+            current = self._current_size()
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self.stats["stored"] += 1
+            self._total_bytes = current - old_size + len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _current_size(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._entries())
+        return self._total_bytes
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name, st.st_size))
+        return entries
+
+    def _evict(self):
+        # Rescan so files written by other workers are accounted for too.
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, name, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.stats["evicted"] += 1
+        self._total_bytes = total
+
+    def record(self, url: str, not_modified: bool):
+        cost = quota_cost(url)
+        with self._lock:
+            self.stats["requests"] += 1
+            if not_modified:
+                self.stats["not_modified"] += 1
+                self.stats["quota_units_saved"] += cost
+            else:
+                self.stats["quota_units_used"] += cost
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "size_bytes": self._current_size(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+youtube_cache = YouTubeResponseCache()
@@ -0,0 +1,49 @@
+import re
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+YOUTUBE_HOSTS = (
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+)
+
+# Path prefixes that carry the video ID as the next path segment.
+PATH_PREFIXES = ("embed", "shorts", "live", "v", "e")
+
+
+def extract_video_id(link: Optional[str]) -> Optional[str]:
+    """
+    Return the 11-character video ID from any common YouTube URL form:
+    watch?v=, youtu.be/, /embed/, /shorts/, /live/, /v/, or a bare ID.
+    """
+    if not link:
+        return None
+    link = link.strip()
+    if VIDEO_ID_RE.match(link):
+        return link
+
+    if "://" not in link:
+        link = "https://" + link
+    parts = urlsplit(link)
+    host = (parts.hostname or "").lower()
+    segments = [s for s in parts.path.split("/") if s]
+
+    candidate = None
+    if host in ("youtu.be", "www.youtu.be"):
+        candidate = segments[0] if segments else None
+    elif host in YOUTUBE_HOSTS:
+        query = parse_qs(parts.query)
+        if query.get("v"):
+            candidate = query["v"][0]
+        elif len(segments) >= 2 and segments[0] in PATH_PREFIXES:
+            candidate = segments[1]
+
+    if candidate and VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None